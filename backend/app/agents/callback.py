@@ -6,22 +6,81 @@ from typing import Optional, Dict
 from app.repositories.change_repository import change_repo
 from app.utils.logger import logger
 
+
+class StatusBatcher:
+    """
+    Coalesces progress updates and writes them with one bulk_write per interval.
+    Only the latest fields per change are kept, intermediate ticks are dropped.
+    """
+    
+    FLUSH_INTERVAL = 0.25  # seconds
+    
+    def __init__(self):
+        self._pending: Dict[str, Dict] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        # Serializes writes: a flush already in bulk_write must finish before a change's
+        # final state is written, or its stale progress $set could land afterwards
+        self._lock = asyncio.Lock()
+    
+    def submit(self, change_id: str, data: Dict):
+        """Queue fields for a change, merging with anything not yet flushed"""
+        self._pending.setdefault(change_id, {}).update(data)
+        
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_later())
+    
+    async def _flush_later(self):
+        await asyncio.sleep(self.FLUSH_INTERVAL)
+        self._flush_task = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Failed to flush status updates: {e}")
+    
+    async def flush(self, change_id: Optional[str] = None):
+        """Write pending updates now (all of them, or only those of one change)"""
+        async with self._lock:
+            await self._flush_locked(change_id)
+    
+    async def write_final(self, change_id: str, write):
+        """Flush the change's queued updates, then run its final write, after any in-flight flush"""
+        async with self._lock:
+            await self._flush_locked(change_id)
+            await write()
+    
+    async def _flush_locked(self, change_id: Optional[str]):
+        if change_id is not None:
+            data = self._pending.pop(change_id, None)
+            updates = [(change_id, data)] if data else []
+        else:
+            updates = list(self._pending.items())
+            self._pending.clear()
+        
+        await change_repo.bulk_update_status(updates)
+
+
+status_batcher = StatusBatcher()
+
+
 class AgentCallback:
     """Callback that saves agent progress to database"""
     
     def __init__(self, change_id: str):
         self.change_id = change_id
     
-    async def update_status(self, status: str, progress: int, message: str = ""):
-        """Update status in database"""
-        logger.info(f"[Agent {self.change_id}] {status}: {message} ({progress}%)")
+    async def update_status(self, status: str, progress: int, message: str = "", **extra_fields):
+        """Queue a status update (flushed in batches by status_batcher)
         
-        await change_repo.update_status(
-            self.change_id,
-            status,
-            progress,
-            message
-        )
+        Any extra_fields (e.g. pom_content) are written in the same $set.
+        """
+        logger.info("[Agent %s] %s: %s (%s%%)", self.change_id, status, message, progress)
+        
+        status_batcher.submit(self.change_id, {
+            "status": status,
+            "progress": progress,
+            "status_message": message,
+            **extra_fields
+        })
     
     async def save_result(self, diff: str, solution: str, modified_files: Optional[Dict[str, str]] = None):
         """Save final results to database"""
@@ -29,15 +88,22 @@ class AgentCallback:
         if modified_files:
             logger.info(f"[Agent {self.change_id}] Modified files: {list(modified_files.keys())}")
         
-        await change_repo.save_result(
+        # Make sure no queued or in-flight progress tick lands after the final state
+        await status_batcher.write_final(
             self.change_id,
-            suggested_fix=solution,
-            diff=diff,
-            modified_files=modified_files
+            lambda: change_repo.save_result(
+                self.change_id,
+                suggested_fix=solution,
+                diff=diff,
+                modified_files=modified_files
+            )
         )
     
     async def save_error(self, error: str):
         """Save error to database"""
         logger.error(f"[Agent {self.change_id}] Error: {error}")
         
-        await change_repo.save_error(self.change_id, error)
+        await status_batcher.write_final(
+            self.change_id,
+            lambda: change_repo.save_error(self.change_id, error)
+        )
@@ -4,6 +4,7 @@ Main service for running the Java migration agent in your web application
 """
 
 import os
+import re
 import json
 import tempfile
 import shutil
@@ -11,9 +12,13 @@ from pathlib import Path
 from langchain_groq import ChatGroq
 from langchain_core.messages import HumanMessage
 from app.common_agents.agent.GitAgent import GitAgent
+from app.core.config import settings
 from .tools import get_tools_for_repo
 from .workflow import build_workflow, SYSTEM_PROMPT
 
+# Source files referenced in Maven compiler output
+_ERROR_FILE_RE = re.compile(r'(src/main/java/[\w/]+\.java)')
+
 
 class JavaMigrationAgentService:
     """Service to run the agent in your web application"""
@@ -49,7 +54,9 @@ class JavaMigrationAgentService:
             dict with 'success', 'diff', 'solution' or 'error'
         """
         
-        output_path = tempfile.mkdtemp(prefix="agent_out_")
+        # The chat log is a debugging aid nothing reads back; skip the temp dir and
+        # per-step writes unless running in debug mode
+        output_path = tempfile.mkdtemp(prefix="agent_out_") if settings.DEBUG else None
         
         try:
             # Get tools for the repository
@@ -60,8 +67,7 @@ class JavaMigrationAgentService:
             )
             
             # PRE-READ ERROR FILES AND INCLUDE IN PROMPT
-            import re
-            error_file_matches = re.findall(r'(src/main/java/[\w/]+\.java)', initial_errors)
+            error_file_matches = _ERROR_FILE_RE.findall(initial_errors)
             unique_files = list(set(error_file_matches))
             
             file_contents = {}
@@ -69,8 +75,7 @@ class JavaMigrationAgentService:
                 try:
                     full_path = Path(repo_path) / file_path
                     if full_path.exists():
-                        with open(full_path, 'r', encoding='utf-8') as f:
-                            file_contents[file_path] = f.read()
+                        file_contents[file_path] = full_path.read_bytes().decode('utf-8')
                         print(f"[DEBUG] Pre-read file: {file_path} ({len(file_contents[file_path])} chars)")
                 except Exception as e:
                     print(f"[WARN] Could not pre-read {file_path}: {e}")
@@ -121,34 +126,36 @@ class JavaMigrationAgentService:
     
     def _create_prompt(self, pom_diff: str, initial_errors: str, file_contents: dict = None) -> str:
         """Create the prompt for the agent with actual file content"""
-        prompt = f"""You are a Java dependency migration expert. A pom.xml file has been updated with new dependencies, causing compilation errors.
+        # Collected as parts and joined once: the file contents can be large
+        parts = [f"""You are a Java dependency migration expert. A pom.xml file has been updated with new dependencies, causing compilation errors.
 
 POM.XML CHANGES:
 ```diff
 {pom_diff}
 ```
-"""
+"""]
         
         if initial_errors:
-            prompt += f"""
+            parts.append(f"""
 COMPILATION ERRORS:
 ```
 {initial_errors}
 ```
-"""
+""")
         
         # Include actual file content so agent doesn't have to guess
         if file_contents:
-            prompt += "\n\n" + "="*80 + "\n"
-            prompt += "📄 CURRENT FILE CONTENTS (ACTUAL SOURCE CODE):\n"
-            prompt += "="*80 + "\n"
+            rule = "="*80 + "\n"
+            parts.append("\n\n" + rule)
+            parts.append("📄 CURRENT FILE CONTENTS (ACTUAL SOURCE CODE):\n")
+            parts.append(rule)
             for file_path, content in file_contents.items():
-                prompt += f"\n=== {file_path} ===\n```java\n{content}\n```\n"
-            prompt += "\n" + "="*80 + "\n"
-            prompt += "⚠️  Your diff MUST match the EXACT lines shown above (including whitespace, blank lines, etc.)\n"
-            prompt += "="*80 + "\n\n"
+                parts.append(f"\n=== {file_path} ===\n```java\n{content}\n```\n")
+            parts.append("\n" + rule)
+            parts.append("⚠️  Your diff MUST match the EXACT lines shown above (including whitespace, blank lines, etc.)\n")
+            parts.append(rule + "\n")
         
-        prompt += """
+        parts.append("""
 YOUR TASK:
 1. Analyze the dependency changes in pom.xml
 2. Look at the ACTUAL file content provided above
@@ -173,6 +180,6 @@ Use the provided tools to:
 - Reset the repository if needed to try different approaches
 
 Provide unified diff format changes to fix the Java source code AND/OR add new dependencies to pom.xml if needed.
-"""
+""")
         
-        return prompt
\ No newline at end of file
+        return "".join(parts)
\ No newline at end of file
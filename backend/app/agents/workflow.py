@@ -17,6 +17,7 @@ from typing_extensions import Annotated, TypedDict
 from langgraph.prebuilt import ToolExecutor, ToolInvocation
 from langgraph.checkpoint.sqlite import SqliteSaver
 from langchain_groq import ChatGroq
+import orjson
 
 
 
@@ -88,6 +89,13 @@ class MessagesState(TypedDict):
     proposed_diff: str | None  # Store the diff that was validated
 
 
+def _dump_tool_result(result) -> str:
+    """Render a tool result as message content (orjson; keeps non-ASCII as-is)"""
+    if isinstance(result, str):
+        return result
+    return orjson.dumps(result, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+
+
 from langchain_groq import ChatGroq
 
 def build_workflow(llm, tools, output_path: str):
@@ -96,25 +104,31 @@ def build_workflow(llm, tools, output_path: str):
     # Create tool executor
     tool_executor = ToolExecutor(tools)
     
-    def call_model(state: MessagesState):
-        messages = state["messages"]
-        
-        # Add system message with tool descriptions
-        tool_descriptions = "\n".join([
-            f"- {tool.name}: {tool.description}" 
-            for tool in tools
-        ])
-        
-        system_msg = f"""You have access to these tools:
+    # Messages already in chat_log.txt; each routing step appends only the new ones
+    # instead of rewriting the whole (ever-growing) conversation
+    chat_log_written = 0
+    
+    # The tool set is fixed for the workflow, so the system message describing it is
+    # rendered once and reused by every model call
+    tool_descriptions = "\n".join([
+        f"- {tool.name}: {tool.description}" 
+        for tool in tools
+    ])
+    
+    system_msg = {"role": "system", "content": f"""You have access to these tools:
 {tool_descriptions}
 
 To use a tool, respond ONLY with JSON in this format:
 {{"tool": "tool_name", "args": {{"param": "value"}}}}
 
 When you have a diff ready to test, provide it ONLY as a markdown code block starting with ```diff - do NOT wrap it in JSON.
-"""
+"""}
+    
+    def call_model(state: MessagesState):
+        messages = state["messages"]
         
-        messages_with_tools = [{"role": "system", "content": system_msg}] + messages
+        # Add system message with tool descriptions
+        messages_with_tools = [system_msg, *messages]
         response = llm.invoke(messages_with_tools)
         
         # Parse JSON tool calls from content if present
@@ -164,7 +178,7 @@ When you have a diff ready to test, provide it ONLY as a markdown code block sta
                 result = tool_executor.invoke(tool_invocation)
                 outputs.append(
                     ToolMessage(
-                        content=json.dumps(result) if not isinstance(result, str) else result,
+                        content=_dump_tool_result(result),
                         name=tool_call["name"],
                         tool_call_id=tool_call["id"]
                     )
@@ -277,7 +291,7 @@ When you have a diff ready to test, provide it ONLY as a markdown code block sta
                 )
             else:
                 result_message = ToolMessage(
-                    content=json.dumps(tool_result) if not isinstance(tool_result, str) else tool_result,
+                    content=_dump_tool_result(tool_result),
                     name=tool_call["name"],
                     tool_call_id=tool_call["id"]
                 )
@@ -301,14 +315,16 @@ When you have a diff ready to test, provide it ONLY as a markdown code block sta
         last_message = messages[-1]
         
         # Save chat log
-        if output_path:
+        nonlocal chat_log_written
+        if output_path and len(messages) > chat_log_written:
             try:
-                with open(os.path.join(output_path, "chat_log.txt"), "w", encoding="utf-8") as f:
-                    for m in messages:
-                        if hasattr(m, 'pretty_repr'):
-                            f.write(m.pretty_repr() + "\n\n")
-                        else:
-                            f.write(str(m) + "\n\n")
+                mode = "a" if chat_log_written else "w"
+                with open(os.path.join(output_path, "chat_log.txt"), mode, encoding="utf-8") as f:
+                    f.write("".join(
+                        (m.pretty_repr() if hasattr(m, 'pretty_repr') else str(m)) + "\n\n"
+                        for m in messages[chat_log_written:]
+                    ))
+                chat_log_written = len(messages)
             except Exception as e:
                 print(f"[WARN] Could not save chat log: {e}")
         
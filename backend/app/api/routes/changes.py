@@ -2,6 +2,7 @@
 Repository management endpoints
 View repos, changes, and trigger repairs
 """
+import asyncio
 from fastapi import APIRouter, HTTPException, Depends
 from app.repositories.change_repository import change_repo
 from app.repositories.repo_repository import repository_repo
@@ -134,126 +135,94 @@ async def create_pull_request(change_id: str, current_user: UserInDB = Depends(g
             raise HTTPException(500, f"Failed to get HEAD SHA of {base_branch} branch")
         
         
-        # Step 1: Create new branch from the commit
-        logger.info(f"Creating branch {branch_name} from {change.commit_sha}")
-        branch_created = await github_service.create_branch(
-            owner=owner,
-            repo=repo_name,
-            branch_name=branch_name,
-            base_sha=base_sha,
-            access_token=current_user.access_token
-        )
-        
-        if not branch_created:
-            raise HTTPException(500, "Failed to create branch on GitHub")
-        
-        # Step 2: Determine how to apply changes
+        # Step 1: Determine the new file contents
         # If we have modified_files (from recipe agent), use them directly
-        # Otherwise, parse the diff and apply it
-        
-        updated_files = []
+        # Otherwise, parse the diff and apply it to the files at base_sha
         
         if change.modified_files:
             # Recipe agent provided actual file contents - use them directly!
             logger.info(f"Using {len(change.modified_files)} modified files from recipe agent (no diff parsing needed)")
-            
-            for file_path, new_content in change.modified_files.items():
-                logger.info(f"Updating file directly: {file_path}")
-                
-                # Get current file SHA (needed for update)
-                file_data = await github_service.get_file_content_with_sha(
-                    owner=owner,
-                    repo=repo_name,
-                    file_path=file_path,
-                    branch=branch_name,
-                    access_token=current_user.access_token
-                )
-                
-                if not file_data:
-                    logger.error(f"Failed to get SHA for {file_path}")
-                    continue
-                
-                _, file_sha = file_data
-                
-                # Update file on GitHub with the correct content
-                commit_result = await github_service.update_file(
-                    owner=owner,
-                    repo=repo_name,
-                    file_path=file_path,
-                    content=new_content,
-                    message=f"🤖 AURA: Fix {file_path}",
-                    branch=branch_name,
-                    access_token=current_user.access_token,
-                    sha=file_sha
-                )
-                
-                if commit_result:
-                    updated_files.append(file_path)
-                    logger.info(f"✓ Updated {file_path}")
-                else:
-                    logger.error(f"✗ Failed to update {file_path}")
+            new_files = dict(change.modified_files)
         else:
             # Fall back to parsing diff (for legacy agent or if no modified_files)
             logger.info(f"Parsing unified diff (no modified_files available)")
-            file_changes = github_service.parse_unified_diff(change.diff or change.suggested_fix)
+            file_changes = await github_service.parse_unified_diff_async(change.diff or change.suggested_fix)
             
             if not file_changes:
                 raise HTTPException(400, "No file changes found in diff")
             
             logger.info(f"Found {len(file_changes)} files to update from diff")
             
+            # Skip /dev/null paths (new file creation - not supported yet) in one pass
+            supported_changes = []
             for file_change in file_changes:
-                file_path = file_change["file_path"]
-                
-                # Skip if it's /dev/null (new file creation - not supported yet)
-                if file_path == "/dev/null":
-                    logger.warning(f"Skipping new file creation: not implemented")
-                    continue
-                
-                logger.info(f"Updating file: {file_path}")
-                
-                # Get current file content and SHA
-                file_data = await github_service.get_file_content_with_sha(
+                if file_change["file_path"] == "/dev/null":
+                    logger.warning("Skipping new file creation: not implemented")
+                else:
+                    supported_changes.append(file_change)
+            file_changes = supported_changes
+            
+            # Get current file contents concurrently - the reads are independent
+            # and share one HTTP/2 connection
+            file_datas = await asyncio.gather(*(
+                github_service.get_file_content_with_sha(
                     owner=owner,
                     repo=repo_name,
-                    file_path=file_path,
-                    branch=branch_name,
+                    file_path=file_change["file_path"],
+                    branch=base_sha,
                     access_token=current_user.access_token
                 )
+                for file_change in file_changes
+            ))
+            
+            new_files = {}
+            for file_change, file_data in zip(file_changes, file_datas):
+                file_path = file_change["file_path"]
                 
                 if not file_data:
-                    logger.error(f"Failed to get content for {file_path}")
+                    logger.error(f"✗ Failed to get content for {file_path}")
                     continue
                 
-                original_content, file_sha = file_data
+                original_content, _ = file_data
                 
                 # Apply diff to content
-                new_content = github_service.apply_diff_to_content(
+                new_files[file_path] = await github_service.apply_diff_to_content_async(
                     original_content,
                     file_change["full_content"]
                 )
-                
-                # Update file on GitHub
-                commit_result = await github_service.update_file(
-                    owner=owner,
-                    repo=repo_name,
-                    file_path=file_path,
-                    content=new_content,
-                    message=f"🤖 AURA: Fix {file_path}",
-                    branch=branch_name,
-                    access_token=current_user.access_token,
-                    sha=file_sha
-                )
-                
-                if commit_result:
-                    updated_files.append(file_path)
-                    logger.info(f"✓ Updated {file_path}")
-                else:
-                    logger.error(f"✗ Failed to update {file_path}")
         
-        if not updated_files:
+        if not new_files:
             raise HTTPException(500, "Failed to update any files")
         
+        # Step 2: Commit all files at once on top of base_sha (Git Data API)
+        logger.info(f"Committing {len(new_files)} files on top of {base_sha[:7]}")
+        commit_sha = await github_service.commit_tree(
+            owner=owner,
+            repo=repo_name,
+            base_sha=base_sha,
+            files=new_files,
+            message=f"🤖 AURA: Fix {', '.join(new_files)}",
+            access_token=current_user.access_token
+        )
+        
+        if not commit_sha:
+            raise HTTPException(500, "Failed to commit changes on GitHub")
+        
+        updated_files = list(new_files)
+        
+        # Step 3: Create new branch pointing at the fix commit
+        logger.info(f"Creating branch {branch_name} at {commit_sha[:7]}")
+        branch_created = await github_service.create_branch(
+            owner=owner,
+            repo=repo_name,
+            branch_name=branch_name,
+            base_sha=commit_sha,
+            access_token=current_user.access_token
+        )
+        
+        if not branch_created:
+            raise HTTPException(500, "Failed to create branch on GitHub")
+        
         # Step 4: Create pull request
         logger.info(f"Creating pull request")
         pr_title = f"🤖 AURA: Auto-fix dependency migration issues"
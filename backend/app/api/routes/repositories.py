@@ -70,7 +70,7 @@ async def delete_repository(id: str, current_user : UserInDB = Depends(get_curre
             raise HTTPException(403, "Access denied, Github Ids don't match")
         
         # Now delete the repo
-        repo_id = await repository_repo.delete_by_githubid(id)
+        repo_id = await repository_repo.delete_by_id(id)
         
         return {"id": repo_id, "message": "Repository deleted successfully"}
     except HTTPException:
@@ -4,7 +4,7 @@ Receives GitHub App webhook events for pom.xml changes
 """
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
-from fastapi import APIRouter, Header, Request, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Header, Request, HTTPException
 from datetime import datetime
 from app.services.github_service import github_service
 from app.database.mongodb import get_database
@@ -19,6 +19,7 @@ router = APIRouter()
 async def github_webhook(
 
     request: Request,
+    background_tasks: BackgroundTasks,
     x_github_event: Optional[str] = Header(None),
     x_hub_signature_256: Optional[str] = Header(None)
 ):
@@ -91,11 +92,19 @@ async def github_webhook(
     if not pom_changed:
         return {"message": "No pom.xml changes detected (or changes are from AURA merge)"}
     
-    result = await webhook_service.process_webhook(repo_data=repo_data, owner_data= owner_data, commit_with_pom= commit_with_pom, installation_id= installation_id)
+    # GitHub times out slow deliveries; acknowledge now and record the user, repository
+    # and change (which queues the agent run) after the response has been sent
+    background_tasks.add_task(
+        webhook_service.process_webhook,
+        repo_data=repo_data,
+        owner_data=owner_data,
+        commit_with_pom=commit_with_pom,
+        installation_id=installation_id
+    )
     
     return {
-        "status": "success",
-        "message": "pom.xml change processed",
-        "data": result
+        "status": "queued",
+        "message": "pom.xml change detected and queued for processing",
+        "commit": commit_with_pom.get("id", "")[:7]
     }
     
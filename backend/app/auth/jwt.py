@@ -21,10 +21,11 @@ security = HTTPBearer()
 
 def create_access_token(payload: dict) -> str:
     """Create JWT access token"""
+    now = datetime.utcnow()  # one clock read so exp is exactly 7 days after iat
     data = {
         **payload,
-        "iat": datetime.utcnow(),
-        "exp": datetime.utcnow() + timedelta(days=7),
+        "iat": now,
+        "exp": now + timedelta(days=7),
     }
 
     return jwt.encode(
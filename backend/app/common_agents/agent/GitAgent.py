@@ -26,8 +26,11 @@ class GitAgent:
         return self.repo.is_dirty(untracked_files=True)
 
     def raw_checkout(self, repo_path: Path, github_slug: str) -> None:
-        # Clone the repository
-        repo = git.Repo.clone_from(f"https://github.com/{github_slug}.git", repo_path)
+        # Shallow-fetch only the target commit (and its parent for diffs) instead of
+        # cloning the full history; fail fast rather than prompt for credentials
+        repo = git.Repo.init(repo_path)
+        repo.git.update_environment(GIT_TERMINAL_PROMPT="0")
+        repo.create_remote("origin", f"https://github.com/{github_slug}.git")
         repo.git.fetch("origin", self.commit_hash, depth=2)
         repo.git.checkout(self.commit_hash)
         return repo
@@ -67,8 +67,7 @@ class MavenReproducerAgent:
         run_tests: bool = True,
         timeout: int = 1800,
     ) -> Tuple[Tuple[bool, bool], str, dict]:
-        with open(file_path, "w", encoding="utf-8") as out_file_wrapper:
-            out_file_wrapper.write(file_content)
+        Path(file_path).write_text(file_content, encoding="utf-8")
 
         (compile, test), error_text = self._compile_maven(run_tests, timeout)
 
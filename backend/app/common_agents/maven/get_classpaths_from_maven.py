@@ -3,6 +3,9 @@ import tempfile
 
 import requests
 
+# Jar entry path -> dotted Java name in a single pass
+_PATH_TO_DOTTED = str.maketrans("/", ".")
+
 
 def get_classpaths_from_maven(download_link: str) -> tuple[list[str], list[str]]:
     """
@@ -46,12 +49,12 @@ def get_classpaths_from_maven(download_link: str) -> tuple[list[str], list[str]]
             for file in class_files:
                 print(file)
                 if file.endswith(".class"):
-                    class_name = file.replace("/", ".").replace(".class", "")
+                    class_name = file[: -len(".class")].translate(_PATH_TO_DOTTED)
                     classes.append(class_name)
                     package_name = class_name.rsplit(".", 1)[0]
                     packages.add(package_name)
                 elif file.endswith("/"):
-                    package_name = file.replace("/", ".").rstrip(".")
+                    package_name = file.translate(_PATH_TO_DOTTED).rstrip(".")
                     packages.add(package_name)
 
             return classes, sorted(packages)
@@ -38,6 +38,7 @@ class Settings(BaseSettings):
     
     # App Config
     MAX_REPAIR_ATTEMPTS: int = 3
+    WEBHOOK_WORKERS: int = 2  # Concurrent agent runs (clone + Maven container + LLM each)
     
     class Config:
         env_file = ".env"
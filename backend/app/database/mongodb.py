@@ -21,6 +21,16 @@ async def connect_db():
     db.client = AsyncIOMotorClient(settings.MONGODB_URL)
     print("Connected to MongoDB")
 
+async def ensure_indexes():
+    """Create indexes backing the hot lookup paths (idempotent)"""
+    database = get_database()
+    await database["users"].create_index("github_id", unique=True)
+    await database["repositories"].create_index("github_repo_id", unique=True)
+    await database["repositories"].create_index("owner_id")
+    await database["changes"].create_index([("repository_id", 1), ("created_at", -1)])
+    await database["changes"].create_index([("status", 1), ("created_at", 1)])  # job queue claims
+    print("Ensured MongoDB indexes")
+
 async def close_db():
     db.client.close()
     print("Closed MongoDB connection")
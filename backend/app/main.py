@@ -1,12 +1,27 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Header
 from pydantic import BaseModel
 from fastapi.middleware.cors import CORSMiddleware
-from app.database.mongodb import connect_db, close_db
+from app.database.mongodb import connect_db, close_db, ensure_indexes
 from typing import Optional, List, Dict, Any
 from app.api.routes import webhook, auth, repositories, users, changes
+from app.services.github_service import github_service
+from app.services.webhook_service import webhook_service
 
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await connect_db()
+    await ensure_indexes()
+    await webhook_service.start()
+    yield
+    await webhook_service.stop()
+    # Tear down the shared GitHub client while the event loop is still running
+    await github_service.close()
+    await close_db()
+
+
+app = FastAPI(lifespan=lifespan)
 
 
 
@@ -19,14 +34,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-@app.on_event("startup")
-async def startup():
-    await connect_db()
-
-@app.on_event("shutdown")
-async def shutdown():
-    await close_db()
-
 @app.get("/")
 def root():
     return {"message": "Backend running"}
@@ -18,7 +18,8 @@ Stores detected dependency issues and suggested fixes
 # - created_at
 # - updated_at
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
+from bson import ObjectId
 from typing import Optional, List, Dict
 from datetime import datetime
 from enum import Enum
@@ -69,5 +70,11 @@ class ChangeInDB(Change):
     
     class Config:
         populate_by_name = True
+    
+    @field_validator("id", mode="before")
+    @classmethod
+    def _object_id_to_str(cls, value):
+        """Accept raw Mongo ObjectIds so documents can be validated as-is"""
+        return str(value) if isinstance(value, ObjectId) else value
 
 
@@ -16,7 +16,8 @@ Repository MongoDB model
 """
 Repository MongoDB model
 """
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
+from bson import ObjectId
 from typing import Optional, List
 from datetime import datetime
 
@@ -39,3 +40,9 @@ class RepositoryInDB(Repository):
     
     class Config:
         populate_by_name = True
+    
+    @field_validator("id", mode="before")
+    @classmethod
+    def _object_id_to_str(cls, value):
+        """Accept raw Mongo ObjectIds so documents can be validated as-is"""
+        return str(value) if isinstance(value, ObjectId) else value
@@ -15,7 +15,8 @@ User MongoDB model
 """
 User MongoDB model
 """
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
+from bson import ObjectId
 from typing import Optional, List
 from datetime import datetime
 
@@ -34,4 +35,10 @@ class UserInDB(User):
     id: Optional[str] = Field(None, alias="_id")
     
     class Config:
-        populate_by_name = True
\ No newline at end of file
+        populate_by_name = True
+    
+    @field_validator("id", mode="before")
+    @classmethod
+    def _object_id_to_str(cls, value):
+        """Accept raw Mongo ObjectIds so documents can be validated as-is"""
+        return str(value) if isinstance(value, ObjectId) else value
\ No newline at end of file
@@ -5,7 +5,7 @@ Generates rewrite.yaml files and updates pom.xml with OpenRewrite plugin.
 
 import os
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Tuple
 import xml.etree.ElementTree as ET
 from app.utils.logger import logger
 
@@ -77,7 +77,7 @@ class RecipeGenerator:
         
         yaml_content = "\n".join(yaml_lines)
         
-        logger.debug(f"Generated rewrite.yaml content:\n{yaml_content}")
+        logger.debug("Generated rewrite.yaml content:\n%s", yaml_content)
         return yaml_content
     
     def write_rewrite_yaml(
@@ -86,24 +86,23 @@ class RecipeGenerator:
         display_name: str,
         description: str,
         recipe_list: List[Dict[str, Any]]
-    ) -> Path:
+    ) -> Tuple[Path, str]:
         """
         Write rewrite.yaml file to the project root.
         
         Returns:
-            Path to the created file
+            Tuple of (path to the created file, the YAML content written)
         """
         yaml_content = self.generate_rewrite_yaml(
             recipe_name, display_name, description, recipe_list
         )
         
-        logger.info(f"Writing rewrite.yaml to {self.rewrite_yaml_path}")
-        logger.debug(f"Content:\n{yaml_content}")
+        logger.info("Writing rewrite.yaml to %s", self.rewrite_yaml_path)
+        logger.debug("Content:\n%s", yaml_content)
         
-        with open(self.rewrite_yaml_path, 'w', encoding='utf-8') as f:
-            f.write(yaml_content)
+        self.rewrite_yaml_path.write_text(yaml_content, encoding='utf-8')
         
-        return self.rewrite_yaml_path
+        return self.rewrite_yaml_path, yaml_content
     
     def apply_add_dependency_directly(self, group_id: str, artifact_id: str, version: str, scope: str = None) -> bool:
         """
@@ -114,7 +113,7 @@ class RecipeGenerator:
             True if successful, False otherwise
         """
         if not self.pom_path.exists():
-            logger.error(f"pom.xml not found at {self.pom_path}")
+            logger.error("pom.xml not found at %s", self.pom_path)
             return False
         
         try:
@@ -147,7 +146,7 @@ class RecipeGenerator:
                 existing_artifact = dep.find(f"{ns_uri}artifactId")
                 if (existing_group is not None and existing_group.text == group_id and
                     existing_artifact is not None and existing_artifact.text == artifact_id):
-                    logger.info(f"Dependency {group_id}:{artifact_id} already exists in pom.xml")
+                    logger.info("Dependency %s:%s already exists in pom.xml", group_id, artifact_id)
                     return True
             
             # Create new dependency element
@@ -172,11 +171,11 @@ class RecipeGenerator:
             self._indent_xml(root)
             tree.write(self.pom_path, encoding='utf-8', xml_declaration=True)
             
-            logger.info(f"Added dependency {group_id}:{artifact_id}:{version} to pom.xml")
+            logger.info("Added dependency %s:%s:%s to pom.xml", group_id, artifact_id, version)
             return True
             
         except Exception as e:
-            logger.error(f"Failed to add dependency to pom.xml: {e}")
+            logger.error("Failed to add dependency to pom.xml: %s", e)
             return False
     
     def _indent_xml(self, elem, level=0):
@@ -209,7 +208,7 @@ class RecipeGenerator:
         self._maven_only_recipes = maven_only_recipes
         
         if not self.pom_path.exists():
-            logger.error(f"pom.xml not found at {self.pom_path}")
+            logger.error("pom.xml not found at %s", self.pom_path)
             return False
         
         try:
@@ -272,14 +271,14 @@ class RecipeGenerator:
             
             # Write back to file
             tree.write(self.pom_path, encoding='utf-8', xml_declaration=True)
-            logger.info(f"Added rewrite-maven-plugin to {self.pom_path}")
+            logger.info("Added rewrite-maven-plugin to %s", self.pom_path)
             return True
             
         except ET.ParseError as e:
-            logger.error(f"Failed to parse pom.xml: {e}")
+            logger.error("Failed to parse pom.xml: %s", e)
             return False
         except Exception as e:
-            logger.error(f"Failed to modify pom.xml: {e}")
+            logger.error("Failed to modify pom.xml: %s", e)
             return False
     
     def _create_rewrite_plugin_element(self, recipe_name: str, ns_uri: str) -> ET.Element:
@@ -388,4 +387,4 @@ class RecipeGenerator:
         """Remove generated rewrite.yaml file."""
         if self.rewrite_yaml_path.exists():
             os.remove(self.rewrite_yaml_path)
-            logger.info(f"Removed {self.rewrite_yaml_path}")
+            logger.info("Removed %s", self.rewrite_yaml_path)
@@ -38,22 +38,6 @@ class RecipeOrchestrator:
         self.recipe_service = RecipeAgentService(groq_api_key)
         self.groq_api_key = groq_api_key or settings.GROQ_API_KEY
     
-    def _verify_version(self, version: str, group_id: str = None, artifact_id: str = None) -> str:
-        """
-        Verify a dependency version against Maven Central.
-        
-        Instead of guessing version formats (adding .0 etc.), this queries
-        Maven Central to confirm the version actually exists and corrects
-        it if needed.
-        """
-        if not version or not group_id or not artifact_id:
-            return version
-        
-        resolved = maven_central_tool.resolve_correct_version(group_id, artifact_id, version)
-        if resolved != version.strip():
-            logger.info(f"[RecipeOrchestrator] Version resolved via Maven Central: {group_id}:{artifact_id}:{version} -> {resolved}")
-        return resolved
-    
     def process_breaking_change(
         self,
         repo_path: str,
@@ -80,16 +64,27 @@ class RecipeOrchestrator:
                 - should_use_existing_agent: bool - whether to fall back to existing agent
                 - message: str - status message
         """
+        # Nothing to analyze - skip the LLM roundtrip entirely
+        if not (pom_diff and pom_diff.strip()) and not (compilation_errors and compilation_errors.strip()):
+            logger.info(f"[RecipeOrchestrator] No pom.xml diff or compilation errors for {repo_slug}, skipping")
+            return {
+                "success": False,
+                "used_recipes": False,
+                "should_use_existing_agent": False,
+                "message": "No breaking change detected",
+                "diff": ""
+            }
+
         logger.info(f"[RecipeOrchestrator] Starting recipe-based analysis for {repo_slug}")
         
         project_path = Path(repo_path)
         
-        # Read pom.xml content for context
+        # Read the pom.xml excerpt for context (only what the prompt will use)
         pom_path = project_path / "pom.xml"
         pom_content = ""
         if pom_path.exists():
-            with open(pom_path, 'r', encoding='utf-8') as f:
-                pom_content = f.read()
+            with open(pom_path, 'rb') as f:
+                pom_content = f.read(RecipeAgentService.POM_EXCERPT_BYTES).decode('utf-8', 'ignore')
         
         # Step 1: Analyze the breaking change with LLM
         logger.info("[RecipeOrchestrator] Analyzing breaking change with LLM...")
@@ -122,6 +117,8 @@ class RecipeOrchestrator:
             }
         
         # SAFETY & NORMALIZATION: Clean up recipe arguments
+        # Version checks are collected here and resolved in one concurrent batch below
+        version_checks = []  # (args, key, group_id, artifact_id, version)
         for recipe in selected_recipes:
             recipe_name = recipe.get("name", "")
             args = recipe.get("arguments", {})
@@ -136,20 +133,31 @@ class RecipeOrchestrator:
             # Verify version numbers against Maven Central for all recipes
             # This is CRITICAL - Maven Central requires exact version strings
             if "version" in args:
-                group_id = args.get("groupId", "")
-                artifact_id = args.get("artifactId", "")
-                old_version = args["version"]
-                args["version"] = self._verify_version(old_version, group_id, artifact_id)
-                if args["version"] != old_version:
-                    logger.info(f"[RecipeOrchestrator] Recipe version verified: {old_version} -> {args['version']}")
+                version_checks.append((
+                    args, "version",
+                    args.get("groupId", ""),
+                    args.get("artifactId", ""),
+                    args["version"]
+                ))
             
             if "newVersion" in args:
-                group_id = args.get("groupId", args.get("newGroupId", ""))
-                artifact_id = args.get("artifactId", args.get("newArtifactId", ""))
-                old_version = args["newVersion"]
-                args["newVersion"] = self._verify_version(old_version, group_id, artifact_id)
-                if args["newVersion"] != old_version:
-                    logger.info(f"[RecipeOrchestrator] Recipe newVersion verified: {old_version} -> {args['newVersion']}")
+                version_checks.append((
+                    args, "newVersion",
+                    args.get("groupId", args.get("newGroupId", "")),
+                    args.get("artifactId", args.get("newArtifactId", "")),
+                    args["newVersion"]
+                ))
+        
+        # Coordinates without a groupId/artifactId can't be looked up; leave them as-is
+        version_checks = [check for check in version_checks if check[2] and check[3] and check[4]]
+        resolved_versions = maven_central_tool.resolve_many([
+            (group_id, artifact_id, version) for _, _, group_id, artifact_id, version in version_checks
+        ])
+        
+        for (args, key, group_id, artifact_id, old_version), resolved in zip(version_checks, resolved_versions):
+            args[key] = resolved
+            if resolved != old_version:
+                logger.info(f"[RecipeOrchestrator] Recipe {key} verified via Maven Central: {group_id}:{artifact_id}:{old_version} -> {resolved}")
         
         # Step 3: Generate rewrite.yaml and update pom.xml
         logger.info(f"[RecipeOrchestrator] Generating rewrite.yaml with {len(selected_recipes)} recipes...")
@@ -161,23 +169,18 @@ class RecipeOrchestrator:
         
         # Check if all recipes are Maven-only (don't need Java source parsing)
         # Maven-only recipes can work on broken projects because they only modify pom.xml
-        MAVEN_ONLY_RECIPES = [
-            "org.openrewrite.maven.AddDependency",
-            "org.openrewrite.maven.RemoveDependency",
-            "org.openrewrite.maven.UpgradeDependency",
-            "org.openrewrite.maven.ChangeDependencyGroupIdAndArtifactId",
-            "org.openrewrite.maven.AddPlugin",
-            "org.openrewrite.maven.ChangePluginConfiguration",
-            "org.openrewrite.maven.ChangePropertyValue",
-            "org.openrewrite.maven.AddProperty",
-        ]
-        maven_only = all(
-            r.get("name", "") in MAVEN_ONLY_RECIPES or r.get("name", "").startswith("org.openrewrite.maven.")
-            for r in selected_recipes
-        )
-        
         # Java recipes require the project to compile - warn if selected for broken projects
-        java_recipes = [r.get("name") for r in selected_recipes if r.get("name", "").startswith("org.openrewrite.java.")]
+        # Single pass: each recipe name is classified once
+        maven_only = True
+        java_recipes = []
+        for r in selected_recipes:
+            name = r.get("name", "")
+            if name.startswith("org.openrewrite.java."):
+                java_recipes.append(name)
+                maven_only = False
+            elif not name.startswith("org.openrewrite.maven."):
+                maven_only = False
+        
         if java_recipes:
             logger.warning(f"[RecipeOrchestrator] Java recipes selected: {java_recipes}")
             logger.warning("[RecipeOrchestrator] Java recipes require compilable code - may fail on broken projects")
@@ -189,7 +192,7 @@ class RecipeOrchestrator:
         # Always use OpenRewrite for recipe execution (no direct pom.xml modification)
         try:
             # Write rewrite.yaml
-            yaml_path = generator.write_rewrite_yaml(
+            yaml_path, yaml_content = generator.write_rewrite_yaml(
                 recipe_name=recipe_name,
                 display_name=display_name,
                 description=description,
@@ -198,8 +201,6 @@ class RecipeOrchestrator:
             logger.info(f"[RecipeOrchestrator] Created rewrite.yaml at: {yaml_path}")
             
             # Log the content for debugging
-            with open(yaml_path, 'r') as f:
-                yaml_content = f.read()
             logger.info(f"[RecipeOrchestrator] rewrite.yaml content:\n{yaml_content}")
             
             # Add plugin to pom.xml (skip Java parsing for Maven-only recipes)
@@ -339,10 +340,11 @@ class RecipeOrchestrator:
             # Read the content of each modified file
             for rel_path in modified_paths:
                 file_path = project_path / rel_path
-                if file_path.exists() and file_path.is_file():
+                if file_path.is_file():
                     try:
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            modified_files[rel_path] = f.read()
+                        # One read of the whole file; also keeps CRLF line endings intact
+                        # for the content pushed back to GitHub
+                        modified_files[rel_path] = file_path.read_bytes().decode('utf-8')
                         logger.info(f"[RecipeOrchestrator] Captured modified file: {rel_path}")
                     except Exception as e:
                         logger.warning(f"[RecipeOrchestrator] Could not read {rel_path}: {e}")
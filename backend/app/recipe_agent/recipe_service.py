@@ -3,72 +3,37 @@ Recipe Agent Service
 Uses LLM to analyze breaking changes and select appropriate OpenRewrite recipes.
 """
 
-import json
 import os
+from functools import lru_cache
 from pathlib import Path
+import orjson
 from typing import Dict, List, Optional, Any
+from pydantic import BaseModel, Field, ValidationError, field_validator
 from langchain_groq import ChatGroq
 from langchain_core.messages import SystemMessage, HumanMessage
 from app.core.config import settings
 from app.utils.logger import logger
 
 
-class RecipeAgentService:
-    """
-    Service that uses LLM to analyze breaking changes and select OpenRewrite recipes.
-    This runs BEFORE the existing repair agent to attempt recipe-based fixes first.
-    """
-    
-    def __init__(self, groq_api_key: str = None):
-        self.groq_api_key = groq_api_key or settings.GROQ_API_KEY
-        self.llm = ChatGroq(
-            groq_api_key=self.groq_api_key,
-            model_name=settings.LLM_MODEL,
-            temperature=0,
-            max_retries=3,
-            timeout=120
-        )
-        self.recipes = self._load_recipes()
-    
-    def _load_recipes(self) -> List[Dict]:
-        """Load available OpenRewrite recipes from JSON file."""
-        recipes_path = Path(__file__).parent / "recipes.json"
-        try:
-            with open(recipes_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception as e:
-            logger.error(f"Failed to load recipes: {e}")
-            return []
-    
-    def analyze_breaking_change(
-        self,
-        pom_diff: str,
-        compilation_errors: str,
-        pom_content: str = ""
-    ) -> Dict[str, Any]:
-        """
-        Analyze the breaking change and determine if OpenRewrite recipes can fix it.
-        
-        Args:
-            pom_diff: The git diff of pom.xml showing dependency changes
-            compilation_errors: Maven compilation errors
-            pom_content: Full pom.xml content for context
-            
-        Returns:
-            Dict with:
-                - can_use_recipes: bool - whether recipes can handle this
-                - selected_recipes: List[Dict] - recipes to apply with their arguments
-                - recipe_name: str - name for the custom recipe
-                - reasoning: str - explanation of the decision
-        """
-        
-        recipes_context = self._format_recipes_for_prompt()
-        
-        system_prompt = SystemMessage(content="""You are an expert Java dependency migration specialist.
+RECIPES_PATH = Path(__file__).parent / "recipes.json"
+
+
+@lru_cache(maxsize=4)
+def _read_recipes_file(path: str, mtime_ns: int) -> List[Dict]:
+    """Parse the recipes file; cached per (path, mtime) so edits are picked up."""
+    recipes = orjson.loads(Path(path).read_bytes())
+    # Render examples once at load instead of on every prompt build
+    for recipe in recipes:
+        if 'example' in recipe:
+            recipe['_example_rendered'] = orjson.dumps(recipe['example'], option=orjson.OPT_INDENT_2).decode()
+    return recipes
+
+
+SYSTEM_PROMPT_TEMPLATE = """You are an expert Java dependency migration specialist.
 Your task is to analyze breaking changes from dependency version upgrades and determine if OpenRewrite recipes can fix them.
 
 You have access to these OpenRewrite recipes:
-""" + recipes_context + """
+{recipes}
 
 ## RECIPE SELECTION GUIDELINES:
 
@@ -107,31 +72,129 @@ These recipes modify Java source files. Note: They may not work on broken projec
 ## RESPONSE FORMAT:
 
 Respond ONLY with valid JSON:
-{
+{{
     "can_use_recipes": true/false,
     "reasoning": "Detailed explanation of the root cause and fix strategy",
     "recipe_name": "com.aura.fix.DescriptiveName",
     "recipe_display_name": "Fix XYZ Breaking Changes", 
     "recipe_description": "Description of what this recipe does",
     "selected_recipes": [
-        {
+        {{
             "name": "org.openrewrite.maven.AddDependency",
-            "arguments": {
+            "arguments": {{
                 "groupId": "...",
                 "artifactId": "...",
                 "version": "..."
-            }
-        }
+            }}
+        }}
     ]
-}
+}}
 
 If recipes CANNOT fix the issue (e.g., requires complex logic changes), return:
-{
+{{
     "can_use_recipes": false,
     "reasoning": "Explanation of why recipes cannot fix this",
     "selected_recipes": []
-}
-""")
+}}
+"""
+
+
+def _null_to_default(model, value, info):
+    """LLMs send null for fields they leave empty; treat that like an omitted field"""
+    if value is None:
+        return model.model_fields[info.field_name].get_default(call_default_factory=True)
+    return value
+
+
+class SelectedRecipe(BaseModel):
+    """A recipe chosen by the LLM together with its arguments"""
+    name: Optional[str] = ""
+    arguments: Optional[Dict[str, Any]] = Field(default_factory=dict)
+    
+    @field_validator("name", "arguments", mode="before")
+    @classmethod
+    def _null_fields(cls, value, info):
+        return _null_to_default(cls, value, info)
+
+
+class RecipeAnalysis(BaseModel):
+    """Structured LLM response for a breaking change analysis"""
+    can_use_recipes: bool
+    reasoning: Optional[str] = ""
+    recipe_name: Optional[str] = "com.aura.fix.AutoGeneratedFix"
+    recipe_display_name: Optional[str] = "AURA Auto-Generated Fix"
+    recipe_description: Optional[str] = "Automatically generated fix for breaking changes"
+    selected_recipes: Optional[List[SelectedRecipe]] = Field(default_factory=list)
+    
+    @field_validator(
+        "reasoning", "recipe_name", "recipe_display_name", "recipe_description", "selected_recipes",
+        mode="before"
+    )
+    @classmethod
+    def _null_fields(cls, value, info):
+        return _null_to_default(cls, value, info)
+
+
+class RecipeAgentService:
+    """
+    Service that uses LLM to analyze breaking changes and select OpenRewrite recipes.
+    This runs BEFORE the existing repair agent to attempt recipe-based fixes first.
+    """
+    
+    POM_EXCERPT_BYTES = 3000  # Budget for the pom.xml excerpt in the user prompt
+    
+    def __init__(self, groq_api_key: str = None):
+        self.groq_api_key = groq_api_key or settings.GROQ_API_KEY
+        self.llm = ChatGroq(
+            groq_api_key=self.groq_api_key,
+            model_name=settings.LLM_MODEL,
+            temperature=0,
+            max_retries=3,
+            timeout=120,
+            # JSON mode: the model must return a bare JSON object (no markdown fences)
+            model_kwargs={"response_format": {"type": "json_object"}}
+        )
+        self.recipes = self._load_recipes()
+        # Recipes are immutable after load, so the system prompt is rendered once.
+        # Every call sends a byte-identical prefix (lets OpenAI-compatible
+        # providers like Groq reuse cached prefixes)
+        self._recipes_prompt = self._format_recipes_for_prompt()
+        self._system_prompt_text = SYSTEM_PROMPT_TEMPLATE.format(recipes=self._recipes_prompt)
+    
+    def _load_recipes(self) -> List[Dict]:
+        """Load available OpenRewrite recipes from JSON file."""
+        try:
+            return _read_recipes_file(str(RECIPES_PATH), RECIPES_PATH.stat().st_mtime_ns)
+        except Exception as e:
+            logger.error(f"Failed to load recipes: {e}")
+            return []
+    
+    def analyze_breaking_change(
+        self,
+        pom_diff: str,
+        compilation_errors: str,
+        pom_content: str = ""
+    ) -> Dict[str, Any]:
+        """
+        Analyze the breaking change and determine if OpenRewrite recipes can fix it.
+        
+        Args:
+            pom_diff: The git diff of pom.xml showing dependency changes
+            compilation_errors: Maven compilation errors
+            pom_content: pom.xml content for context (trimmed to POM_EXCERPT_BYTES)
+            
+        Returns:
+            Dict with:
+                - can_use_recipes: bool - whether recipes can handle this
+                - selected_recipes: List[Dict] - recipes to apply with their arguments
+                - recipe_name: str - name for the custom recipe
+                - reasoning: str - explanation of the decision
+        """
+        
+        system_prompt = SystemMessage(content=self._system_prompt_text)
+        
+        # Trim by UTF-8 bytes (not chars) so multi-byte content can't exceed the budget
+        pom_excerpt = pom_content.encode("utf-8")[:self.POM_EXCERPT_BYTES].decode("utf-8", "ignore")
 
         user_prompt = HumanMessage(content=f"""Analyze this breaking change and determine if OpenRewrite recipes can fix it.
 
@@ -147,7 +210,7 @@ If recipes CANNOT fix the issue (e.g., requires complex logic changes), return:
 
 ## CURRENT POM.XML CONTENT:
 ```xml
-{pom_content[:3000] if pom_content else "Not provided"}
+{pom_excerpt or "Not provided"}
 ```
 
 Analyze the errors and determine:
@@ -157,24 +220,19 @@ Analyze the errors and determine:
 
 Respond with JSON only.""")
 
+        content = ""
         try:
             response = self.llm.invoke([system_prompt, user_prompt])
-            content = response.content.strip()
-            
-            # Extract JSON from response (handle markdown code blocks)
-            if "```json" in content:
-                content = content.split("```json")[1].split("```")[0].strip()
-            elif "```" in content:
-                content = content.split("```")[1].split("```")[0].strip()
+            content = response.content
             
-            result = json.loads(content)
-            logger.info(f"Recipe analysis result: can_use_recipes={result.get('can_use_recipes')}")
-            logger.info(f"Reasoning: {result.get('reasoning', 'No reasoning provided')}")
+            result = RecipeAnalysis.model_validate_json(content)
+            logger.info(f"Recipe analysis result: can_use_recipes={result.can_use_recipes}")
+            logger.info(f"Reasoning: {result.reasoning or 'No reasoning provided'}")
             
-            return result
+            return result.model_dump()
             
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse LLM response as JSON: {e}")
+        except ValidationError as e:
+            logger.error(f"Failed to parse LLM response: {e}")
             logger.error(f"Raw response: {content}")
             return {
                 "can_use_recipes": False,
@@ -198,7 +256,7 @@ Respond with JSON only.""")
             lines.append(f"Arguments: {', '.join(recipe['arguments'])}")
             lines.append(f"Required: {', '.join(recipe.get('required_arguments', recipe['arguments']))}")
             if 'example' in recipe:
-                lines.append(f"Example: {json.dumps(recipe['example'], indent=2)}")
+                lines.append(f"Example: {recipe['_example_rendered']}")
         return "\n".join(lines)
     
     def get_available_recipes(self) -> List[Dict]:
@@ -1,12 +1,19 @@
 """
 Change Repository - Database operations for changes
 """
-from typing import Optional, List, Dict
-from datetime import datetime
+from typing import Optional, List, Dict, Tuple
+from datetime import datetime, timedelta, timezone
 from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
 from app.database.mongodb import get_database
 from app.models.change import Change, ChangeInDB, FixStatus
 
+# A worker owns changes in these states; they are requeued if it stops heartbeating
+IN_PROGRESS_STATUSES = [
+    FixStatus.CLONING, FixStatus.PREPARING, FixStatus.ANALYZING,
+    FixStatus.FIXING, FixStatus.VALIDATING
+]
+
 class ChangeRepository:
     """Handles all change database operations"""
     
@@ -39,17 +46,15 @@ class ChangeRepository:
         """Find all changes for a repository"""
         db = get_database()
         
+        # Skip the large blobs (full pom, diff, fix, file contents) - the list
+        # view only needs the summary fields; find_by_id returns the full doc
         cursor = db[self.collection_name].find(
-            {"repository_id": id}
+            {"repository_id": id},
+            projection={"pom_content": 0, "suggested_fix": 0, "diff": 0, "modified_files": 0}
         ).sort("created_at", -1)
         
-        changes = await cursor.to_list(length=100)
-        # Convert ObjectId to string for each change
-        for change in changes:
-            change_id = str(change["_id"])
-            change["_id"] = change_id
-            change["id"] = change_id
-        return [ChangeInDB(**change) for change in changes]
+        # ChangeInDB coerces the ObjectId itself, so documents validate in one pass
+        return [ChangeInDB.model_validate(change) async for change in cursor.limit(100)]
     
     async def update_status(
         self, 
@@ -61,12 +66,13 @@ class ChangeRepository:
     ):
         """Update change status"""
         db = get_database()
+        now = datetime.now(timezone.utc)
         
         update_data = {
             "status": status,
             "progress": progress,
             "status_message": message,
-            "updated_at": datetime.utcnow()
+            "updated_at": now
         }
         
         if pom_content is not None:
@@ -77,6 +83,68 @@ class ChangeRepository:
             {"$set": update_data}
         )
     
+    async def bulk_update_status(self, updates: List[Tuple[str, Dict]]):
+        """Apply several status updates in a single round-trip
+        
+        Args:
+            updates: List of (change_id, fields to $set)
+        """
+        if not updates:
+            return
+        
+        db = get_database()
+        now = datetime.now(timezone.utc)
+        
+        await db[self.collection_name].bulk_write(
+            [
+                UpdateOne({"_id": ObjectId(change_id)}, {"$set": {**data, "updated_at": now}})
+                for change_id, data in updates
+            ],
+            ordered=False
+        )
+    
+    async def claim_next_pending(self) -> Optional[ChangeInDB]:
+        """Atomically take the oldest pending change off the job queue
+        
+        Pending changes are the durable job queue: the claim flips the status in the
+        same operation, so each change is handed to exactly one worker.
+        """
+        db = get_database()
+        now = datetime.now(timezone.utc)
+        
+        change_data = await db[self.collection_name].find_one_and_update(
+            {"status": FixStatus.PENDING},
+            {"$set": {"status": FixStatus.CLONING, "status_message": "Picked up by worker", "updated_at": now}},
+            sort=[("created_at", 1)],
+            projection={"pom_content": 0, "suggested_fix": 0, "diff": 0, "modified_files": 0},
+            return_document=ReturnDocument.AFTER
+        )
+        
+        return ChangeInDB.model_validate(change_data) if change_data else None
+    
+    async def requeue_stale(self, older_than_seconds: int) -> int:
+        """Put changes whose worker died mid-run (e.g. a restart) back in the queue"""
+        db = get_database()
+        now = datetime.now(timezone.utc)
+        
+        result = await db[self.collection_name].update_many(
+            {
+                "status": {"$in": IN_PROGRESS_STATUSES},
+                "updated_at": {"$lt": now - timedelta(seconds=older_than_seconds)}
+            },
+            {"$set": {"status": FixStatus.PENDING, "status_message": "Requeued after interruption", "updated_at": now}}
+        )
+        return result.modified_count
+    
+    async def touch(self, change_id: str):
+        """Heartbeat: bump updated_at of an in-progress change so it isn't requeued as stale"""
+        db = get_database()
+        
+        await db[self.collection_name].update_one(
+            {"_id": ObjectId(change_id), "status": {"$in": IN_PROGRESS_STATUSES}},
+            {"$set": {"updated_at": datetime.now(timezone.utc)}}
+        )
+    
     async def save_result(
         self,
         change_id: str,
@@ -88,6 +156,7 @@ class ChangeRepository:
     ):
         """Save agent results"""
         db = get_database()
+        now = datetime.now(timezone.utc)
         
         update_data = {
             "suggested_fix": suggested_fix,
@@ -96,7 +165,7 @@ class ChangeRepository:
             "agent_output_path": output_path,
             "status": "fixed",
             "progress": 100,
-            "updated_at": datetime.utcnow()
+            "updated_at": now
         }
         
         # Save modified file contents if available (from recipe agent)
@@ -112,6 +181,7 @@ class ChangeRepository:
     async def save_error(self, change_id: str, error_message: str):
         """Save error"""
         db = get_database()
+        now = datetime.now(timezone.utc)
         
         await db[self.collection_name].update_one(
             {"_id": ObjectId(change_id)},
@@ -119,7 +189,7 @@ class ChangeRepository:
                 "$set": {
                     "status": "failed",
                     "error_message": error_message,
-                    "updated_at": datetime.utcnow()
+                    "updated_at": now
                 }
             }
         )
@@ -130,13 +200,14 @@ class ChangeRepository:
     async def update_pr_url(self, change_id: str, pr_url: str):
         """Update change with pull request URL"""
         db = get_database()
+        now = datetime.now(timezone.utc)
         
         await db[self.collection_name].update_one(
             {"_id": ObjectId(change_id)},
             {
                 "$set": {
                     "pull_request_url": pr_url,
-                    "updated_at": datetime.utcnow()
+                    "updated_at": now
                 }
             }
         )
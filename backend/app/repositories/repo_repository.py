@@ -1,8 +1,10 @@
-from datetime import datetime
+import asyncio
+from datetime import datetime, timezone
 from app.database.mongodb import get_database
 from app.models.repository import RepositoryInDB
 from app.repositories.change_repository import change_repo
 from bson import ObjectId
+from pymongo import ReturnDocument
 
 class RepositoryRepository:
     def __init__(self):
@@ -12,10 +14,24 @@ class RepositoryRepository:
         db = get_database()
         repo_collection = db[self.collection_name]
 
-        repos = await repo_collection.find({"owner_id":owner_id}).to_list(None)
+        cursor = repo_collection.find(
+            {"owner_id": owner_id},
+            projection={
+                "github_repo_id": 1,
+                "name": 1,
+                "full_name": 1,
+                "owner": 1,
+                "is_active": 1,
+                "last_commit_sha": 1,
+                "updated_at": 1
+            }
+        ).limit(500)
 
-        for repo in repos:
+        # Stringify _id while iterating the cursor instead of a second pass over a list
+        repos = []
+        async for repo in cursor:
             repo["_id"] = str(repo["_id"])
+            repos.append(repo)
 
         return repos
 
@@ -49,12 +65,16 @@ class RepositoryRepository:
         db = get_database()
         repo_collection = db[self.collection_name]
 
-        repo_data = await repo_collection.delete_one({"_id": ObjectId(id)})
-        await change_repo.delete_by_repo_id(id)
+        # Delete the repository and cascade to its changes concurrently
+        repo_data, _ = await asyncio.gather(
+            repo_collection.find_one_and_delete(
+                {"_id": ObjectId(id)},
+                projection={"github_repo_id": 1}
+            ),
+            change_repo.delete_by_repo_id(id)
+        )
         
         if repo_data:
-            # Convert ObjectId to string
-            repo_data["_id"] = str(repo_data["_id"])
             return repo_data["github_repo_id"]
         return None
 
@@ -62,8 +82,10 @@ class RepositoryRepository:
 
         db = get_database()
         repo_collection = db[self.collection_name]
+        now = datetime.now(timezone.utc)
 
-        result = await repo_collection.update_one(
+        # Single round-trip: upsert and read back the _id in one command
+        repo_doc = await repo_collection.find_one_and_update(
         {"github_repo_id": repository.github_repo_id},
         {
             "$set": {
@@ -74,22 +96,20 @@ class RepositoryRepository:
                 "installation_id": repository.installation_id,
                 "last_commit_sha": repository.last_commit_sha,
                 "last_pom_change": repository.last_pom_change,
-                "updated_at": datetime.utcnow()
+                "updated_at": now
             },
             "$setOnInsert": {
                 "github_repo_id": repository.github_repo_id,
                 "is_active": True,
-                "created_at": datetime.utcnow()
+                "created_at": now
             }
         },
-        upsert=True
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+        projection={"_id": 1}
         )
-        
-        if result.upserted_id:
-            return str(result.upserted_id)
-        repo_doc = await self.find_by_github_id(repository.github_repo_id)
 
-        return str(repo_doc.id)
+        return str(repo_doc["_id"])
 
         
 repository_repo = RepositoryRepository()
@@ -1,5 +1,6 @@
 from app.database.mongodb import get_database
-from datetime import datetime
+from datetime import datetime, timezone
+from pymongo import ReturnDocument
 from app.models.user import UserInDB
 
 class UserRepository:
@@ -18,35 +19,41 @@ class UserRepository:
             return UserInDB(**user_data)
         return None
 
-    async def create_or_update(self, user):
+    async def create_or_update(self, user, add_repo_id=None):
+        """Upsert the user; add_repo_id also attaches a repository in the same write"""
         db = get_database()
         users_collection = db[self.collection_name]
+        now = datetime.now(timezone.utc)
 
-        result = await users_collection.update_one(
-            {"github_id": user.github_id},
-            {
-                "$set": {
-                    "username": user.username,
-                    "email": user.email,                    # ✅ Update every login
-                    "avatar_url": user.avatar_url,
-                    "access_token": user.access_token,      # ✅ Update every login
-                    "updated_at": datetime.utcnow()
-                },
-                "$setOnInsert": {
-                    "github_id": user.github_id,
-                    "repositories": [],
-                    "created_at": datetime.utcnow()
-                }
+        update = {
+            "$set": {
+                "username": user.username,
+                "email": user.email,                    # ✅ Update every login
+                "avatar_url": user.avatar_url,
+                "access_token": user.access_token,      # ✅ Update every login
+                "updated_at": now
             },
-            upsert=True
+            "$setOnInsert": {
+                "github_id": user.github_id,
+                "created_at": now
+            }
+        }
+        if add_repo_id is None:
+            update["$setOnInsert"]["repositories"] = []
+        else:
+            # $addToSet creates the array on insert, so it can't also be in $setOnInsert
+            update["$addToSet"] = {"repositories": str(add_repo_id)}
+
+        user_doc = await users_collection.find_one_and_update(
+            {"github_id": user.github_id},
+            update,
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+            projection={"_id": 1}
         )
 
         # Return user ID
-        if result.upserted_id:
-            return str(result.upserted_id)
-        else:
-            user_doc = await self.find_by_github_id(user.github_id)
-            return str(user_doc.id)
+        return str(user_doc["_id"])
         
     async def add_repository(self, user_id, repo_id) -> bool :
         db = get_database()
@@ -1,23 +1,39 @@
 """
 Pydantic schemas for request/response validation
 """
-from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, ConfigDict
+from typing import Optional, List
 
 # GitHub webhook schemas
+# Payloads carry many fields we don't model; ignore them rather than store them
+WEBHOOK_MODEL_CONFIG = ConfigDict(extra="ignore", str_strip_whitespace=True)
+
+class Author(BaseModel):
+    model_config = WEBHOOK_MODEL_CONFIG
+
+    name: Optional[str] = None
+    email: Optional[str] = None
+    username: Optional[str] = None
+
 class Commit(BaseModel):
+    model_config = WEBHOOK_MODEL_CONFIG
+
     id: str
     message: str
-    author: Dict[str, Any]
+    author: Author
     added: List[str] = []
     modified: List[str] = []
     removed: List[str] = []
 
 class Repository(BaseModel):
+    model_config = WEBHOOK_MODEL_CONFIG
+
     name: str
     full_name: str
     
 class WebhookPayload(BaseModel):
+    model_config = WEBHOOK_MODEL_CONFIG
+
     ref: str
     repository: Repository
     commits: List[Commit]
@@ -14,45 +14,237 @@ Handles GitHub API interactions
 """
 GitHub Service - Handles GitHub API interactions
 """
+import asyncio
 import hmac
-import hashlib
 import base64
+import copy
 import re
+import time
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
 from typing import Optional, Dict, Any, List, Tuple
 import httpx
+import orjson
+from tenacity import (
+    retry,
+    stop_after_attempt,
+    wait_random_exponential,
+)
 from app.core.config import settings
-from app.repositories.change_repository import change_repo
 from app.utils.logger import logger
 
 
+# Markdown code fences LLMs wrap diffs in
+_FENCE_OPEN = re.compile(r'^```diff\s*\n', re.MULTILINE)
+_FENCE_CLOSE = re.compile(r'\n```\s*$', re.MULTILINE)
+
+# File header of a unified diff: '--- a/path' directly followed by '+++ b/path'
+_DIFF_FILE_HEADER = re.compile(r'^--- (?P<old>.*)\n\+\+\+ (?P<new>.*)$', re.MULTILINE)
+
+# Hunk header: '@@ -start[,count] +start[,count] @@'
+_HUNK_HEADER = re.compile(r'^@@ -(\d+)(?:,(\d+))? \+\d+(?:,(\d+))? @@')
+
+
+
+# Safe to resend after a timeout or 5xx: the server may already have applied a write
+_IDEMPOTENT_METHODS = frozenset({"GET", "HEAD"})
+
+# Failures where the request never reached GitHub, so even a write can be resent
+_NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+def _should_retry(retry_state) -> bool:
+    """Retry idempotent calls on 5xx/transport errors; writes only if they were never sent"""
+    method = retry_state.kwargs.get("method") or retry_state.args[1]
+    idempotent = method.upper() in _IDEMPOTENT_METHODS
+    outcome = retry_state.outcome
+    if outcome.failed:
+        error = outcome.exception()
+        if isinstance(error, _NOT_SENT_ERRORS):
+            return True
+        return idempotent and isinstance(error, httpx.TransportError)
+    return idempotent and outcome.result().status_code >= 500
+
+
+def _retry_after_seconds(value: str) -> Optional[float]:
+    """Parse a Retry-After header (delta-seconds or HTTP-date); None if malformed"""
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
 class GitHubService:
     """Service for GitHub API operations"""
     
+    MAX_FILE_BYTES = 5 * 1024 * 1024  # Upper bound for a single downloaded file
+    REPO_INFO_TTL = 300  # Seconds a cached repo metadata entry stays fresh
+    REPO_INFO_CACHE_SIZE = 512
+    ETAG_CACHE_BYTES = 8 * 1024 * 1024  # Total raw bodies kept for If-None-Match revalidation
+    ETAG_MAX_ENTRY_BYTES = 256 * 1024  # Larger bodies (big file contents) aren't cached
+    MAX_RATE_LIMIT_WAIT = 60  # Longest we'll park a call waiting for the rate limit to reset
+    
     def __init__(self):
         self.webhook_secret = settings.GITHUB_WEBHOOK_SECRET
+        self._secret_bytes = self.webhook_secret.encode("utf-8")  # Encoded once, used per webhook
         self.app_id = settings.GITHUB_APP_ID
+        # Shared pooled client: keeps TCP/TLS connections to api.github.com alive
+        # across calls and multiplexes concurrent requests over HTTP/2
+        self._client = httpx.AsyncClient(
+            base_url="https://api.github.com",
+            http2=True,
+            timeout=30.0,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=30)
+        )
+        # (owner, repo) -> (fetched_at, repo_info); the token is not part of the key
+        self._repo_info_cache: Dict[Tuple[str, str], Tuple[float, Dict[str, Any]]] = {}
+        # url@ref -> (etag, raw body), LRU-bounded by total bytes; 304s don't count against
+        # the rate limit. Raw bytes are re-parsed per hit so callers never share a mutable body
+        self._etag_cache: "OrderedDict[str, Tuple[str, bytes]]" = OrderedDict()
+        self._etag_cache_bytes = 0
+        # Authorization header -> reset time, only for tokens GitHub reported as exhausted;
+        # each user/installation token has its own quota, so one can't park the others
+        self._rate_limit_resets: Dict[str, float] = {}
+    
+    async def close(self):
+        """Close the shared HTTP client (called on application shutdown)"""
+        await self._client.aclose()
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+    
+    @staticmethod
+    def _rate_limit_key(headers: Optional[Dict[str, str]]) -> str:
+        """Rate limits are per token; unauthenticated calls share the anonymous quota"""
+        return (headers or {}).get("Authorization", "")
+    
+    def _track_rate_limit(self, response: httpx.Response, headers: Optional[Dict[str, str]] = None):
+        """Remember when the calling token's rate limit resets if GitHub reports it exhausted"""
+        key = self._rate_limit_key(headers)
+        retry_after = response.headers.get("Retry-After")
+        if retry_after and response.status_code in (403, 429):
+            # Secondary rate limit: GitHub tells us how long to back off
+            delay = _retry_after_seconds(retry_after)
+            if delay is not None:
+                self._rate_limit_resets[key] = time.time() + delay
+                return
+        
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        reset = response.headers.get("X-RateLimit-Reset")
+        if remaining is None or reset is None:
+            return
+        try:
+            exhausted = int(remaining) <= 0
+            reset_at = float(reset)
+        except ValueError:
+            return
+        if exhausted:
+            self._rate_limit_resets[key] = reset_at
+        else:
+            self._rate_limit_resets.pop(key, None)
+    
+    async def _wait_for_rate_limit(self, headers: Optional[Dict[str, str]] = None):
+        """Hold the call until its token's rate limit resets instead of firing a doomed request"""
+        key = self._rate_limit_key(headers)
+        reset_at = self._rate_limit_resets.get(key)
+        if reset_at is None:
+            return
+        
+        delay = reset_at - time.time()
+        if delay <= 0:
+            self._rate_limit_resets.pop(key, None)
+            return
+        
+        logger.warning(f"GitHub rate limit exhausted, waiting {min(delay, self.MAX_RATE_LIMIT_WAIT):.0f}s")
+        await asyncio.sleep(min(delay, self.MAX_RATE_LIMIT_WAIT))
+    
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_random_exponential(multiplier=0.5, max=8),
+        retry=_should_retry,
+        retry_error_callback=lambda state: state.outcome.result(),
+    )
+    async def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        Send a GitHub API request through the shared client.
+        Waits out the token's exhausted rate limit first, then retries with jittered backoff:
+        GET/HEAD on 5xx/transport errors, writes only when the request never reached GitHub.
+        """
+        headers = kwargs.get("headers")
+        await self._wait_for_rate_limit(headers)
+        response = await self._client.request(method, url, **kwargs)
+        self._track_rate_limit(response, headers)
+        return response
+    
+    async def _get_json_conditional(
+        self,
+        url: str,
+        headers: Dict[str, str],
+        params: Optional[Dict[str, str]] = None
+    ) -> Tuple[int, Optional[Any]]:
+        """
+        GET a JSON resource, revalidating with If-None-Match when we hold an ETag.
+        Returns (status_code, body); a 304 is reported as 200 with the cached body.
+        """
+        key = f"{url}@{(params or {}).get('ref', '')}"
+        cached = self._etag_cache.get(key)
+        if cached:
+            headers = {**headers, "If-None-Match": cached[0]}
+        
+        response = await self._request("GET", url, headers=headers, params=params, timeout=30.0)
+        
+        if response.status_code == 304 and cached:
+            if key in self._etag_cache:  # may have been evicted while the request was in flight
+                self._etag_cache.move_to_end(key)
+            return 200, orjson.loads(cached[1])
+        
+        self._evict_etag(key)
+        if response.status_code == 200:
+            body = response.content
+            etag = response.headers.get("ETag")
+            if etag and len(body) <= self.ETAG_MAX_ENTRY_BYTES:
+                self._etag_cache[key] = (etag, body)
+                self._etag_cache_bytes += len(body)
+                while self._etag_cache_bytes > self.ETAG_CACHE_BYTES:
+                    self._evict_etag(next(iter(self._etag_cache)))
+            return 200, orjson.loads(body)
+        
+        return response.status_code, None
+    
+    def _evict_etag(self, key: str):
+        entry = self._etag_cache.pop(key, None)
+        if entry:
+            self._etag_cache_bytes -= len(entry[1])
     
     def verify_webhook_signature(self, payload_body: bytes, signature_header: str) -> bool:
         """
         Verify GitHub webhook signature for security
         CRITICAL: Always verify webhooks in production!
         """
-        if not signature_header:
+        # GitHub sends signature as 'sha256=...'; reject anything else up front
+        # instead of crashing on a malformed header
+        if not signature_header or not signature_header.startswith("sha256="):
             return False
         
-        # GitHub sends signature as 'sha256=...'
-        hash_algorithm, github_signature = signature_header.split('=')
+        github_signature = signature_header[7:]
         
-        # Calculate expected signature
-        mac = hmac.new(
-            self.webhook_secret.encode(),
-            msg=payload_body,
-            digestmod=hashlib.sha256
-        )
-        expected_signature = mac.hexdigest()
+        try:
+            received_signature = bytes.fromhex(github_signature)
+        except ValueError:
+            return False
+        
+        # Calculate expected signature (one-shot digest, no HMAC object)
+        expected_signature = hmac.digest(self._secret_bytes, payload_body, "sha256")
         
         # Constant-time comparison to prevent timing attacks
-        return hmac.compare_digest(expected_signature, github_signature)
+        return hmac.compare_digest(expected_signature, received_signature)
     
     async def get_file_content(
         self, 
@@ -65,36 +257,63 @@ class GitHubService:
         Get file content from GitHub repository
         Used to fetch pom.xml content
         """
-        url = f"https://api.github.com/repos/{owner}/{repo}/contents/{path}"
-        
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                url,
-                params={"ref": ref},
-                headers={
-                    "Accept": "application/vnd.github.v3.raw",  # Get raw content
-                    "Authorization": f"Bearer {settings.GITHUB_APP_ID}"  # Or use installation token
-                }
-            )
+        url = f"/repos/{owner}/{repo}/contents/{path}"
+        
+        return await self._download_raw(
+            url,
+            params={"ref": ref},
+            headers={
+                "Accept": "application/vnd.github.v3.raw",  # Get raw content
+                "Authorization": f"Bearer {settings.GITHUB_APP_ID}"  # Or use installation token
+            }
+        )
+    
+    async def _download_raw(
+        self,
+        url: str,
+        params: Dict[str, str],
+        headers: Dict[str, str]
+    ) -> Optional[str]:
+        """Stream a raw file body into a bounded buffer and decode it once"""
+        await self._wait_for_rate_limit(headers)
+        async with self._client.stream("GET", url, params=params, headers=headers) as response:
+            self._track_rate_limit(response, headers)
+            if response.status_code != 200:
+                return None
             
-            if response.status_code == 200:
-                return response.text
-            return None
+            # Read into a bounded buffer so an unexpectedly large file can't blow up memory
+            chunks = []
+            total = 0
+            async for chunk in response.aiter_bytes(65536):
+                total += len(chunk)
+                if total > self.MAX_FILE_BYTES:
+                    logger.error(f"File {url} exceeds {self.MAX_FILE_BYTES} bytes, aborting download")
+                    return None
+                chunks.append(chunk)
+        
+        return b"".join(chunks).decode("utf-8")
     
     async def get_user_info(self, username: str) -> Optional[Dict[str, Any]]:
         """Get GitHub user information"""
-        url = f"https://api.github.com/users/{username}"
+        url = f"/users/{username}"
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url)
-            
-            if response.status_code == 200:
-                return response.json()
-            return None
+        response = await self._request("GET", url)
+        
+        if response.status_code == 200:
+            return orjson.loads(response.content)
+        return None
     
     async def get_repo_info(self, owner: str, repo: str, access_token: str = None) -> Optional[Dict[str, Any]]:
-        """Get GitHub repository information"""
-        url = f"https://api.github.com/repos/{owner}/{repo}"
+        """
+        Get GitHub repository information (cached for REPO_INFO_TTL seconds).
+        Callers get their own copy, so mutating it can't corrupt the cached entry.
+        """
+        key = (owner, repo)
+        cached = self._repo_info_cache.get(key)
+        if cached and time.monotonic() - cached[0] < self.REPO_INFO_TTL:
+            return copy.deepcopy(cached[1])
+        
+        url = f"/repos/{owner}/{repo}"
         
         headers = {
             "Accept": "application/vnd.github.v3+json"
@@ -103,12 +322,19 @@ class GitHubService:
         if access_token:
             headers["Authorization"] = f"Bearer {access_token}"
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=headers)
-            
-            if response.status_code == 200:
-                return response.json()
-            return None
+        status, repo_info = await self._get_json_conditional(url, headers)
+        
+        if status == 200:
+            self._repo_info_cache.pop(key, None)
+            if len(self._repo_info_cache) >= self.REPO_INFO_CACHE_SIZE:
+                # Evict the oldest entry (dicts keep insertion order)
+                self._repo_info_cache.pop(next(iter(self._repo_info_cache)))
+            self._repo_info_cache[key] = (time.monotonic(), repo_info)
+            return copy.deepcopy(repo_info)
+        
+        # Repo gone or no longer accessible: drop any stale entry
+        self._repo_info_cache.pop(key, None)
+        return None
     
     async def get_default_branch(self, owner: str, repo: str, access_token: str = None) -> str:
         """Get the default branch of a repository (e.g., 'main' or 'master')"""
@@ -135,7 +361,7 @@ class GitHubService:
         """
         Create a pull request on GitHub
         """
-        url = f"https://api.github.com/repos/{owner}/{repo}/pulls"
+        url = f"/repos/{owner}/{repo}/pulls"
         
         headers = {
             "Accept": "application/vnd.github.v3+json",
@@ -156,19 +382,19 @@ class GitHubService:
             "base": base_branch
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                url,
-                json=payload,
-                headers=headers,
-                timeout=30.0
-            )
-            
-            if response.status_code == 201:
-                return response.json()
-            else:
-                logger.error(f"Failed to create PR: {response.status_code} - {response.text}")
-                return None
+        response = await self._request(
+            "POST",
+            url,
+            content=orjson.dumps(payload),
+            headers=headers,
+            timeout=30.0
+        )
+        
+        if response.status_code == 201:
+            return orjson.loads(response.content)
+        else:
+            logger.error(f"Failed to create PR: {response.status_code} - {response.text}")
+            return None
     
     async def create_branch(
         self,
@@ -179,7 +405,7 @@ class GitHubService:
         access_token: str
     ) -> bool:
         """Create a new branch in the repository"""
-        url = f"https://api.github.com/repos/{owner}/{repo}/git/refs"
+        url = f"/repos/{owner}/{repo}/git/refs"
         
         headers = {
             "Accept": "application/vnd.github.v3+json",
@@ -192,26 +418,26 @@ class GitHubService:
             "sha": base_sha
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                url,
-                json=payload,
-                headers=headers,
-                timeout=30.0
-            )
-            
-            logger.info(f"Branch creation response: {response.status_code}")
-            logger.info(f"Response body: {response.text}")
-            
-            if response.status_code == 201:
-                return True
-            elif response.status_code == 422:
-                # Branch might already exist
-                logger.warning(f"Branch {branch_name} might already exist: {response.text}")
-                return True  # Consider it success if branch exists
-            else:
-                logger.error(f"Failed to create branch: {response.status_code} - {response.text}")
-                return False
+        response = await self._request(
+            "POST",
+            url,
+            content=orjson.dumps(payload),
+            headers=headers,
+            timeout=30.0
+        )
+        
+        logger.info(f"Branch creation response: {response.status_code}")
+        logger.info(f"Response body: {response.text}")
+        
+        if response.status_code == 201:
+            return True
+        elif response.status_code == 422:
+            # Branch might already exist
+            logger.warning(f"Branch {branch_name} might already exist: {response.text}")
+            return True  # Consider it success if branch exists
+        else:
+            logger.error(f"Failed to create branch: {response.status_code} - {response.text}")
+            return False
         
     async def get_branch_head_sha(
         self,
@@ -221,26 +447,26 @@ class GitHubService:
         access_token: str
     ) -> Optional[str]:
         """Get the HEAD SHA of a branch"""
-        url = f"https://api.github.com/repos/{owner}/{repo}/git/refs/heads/{branch}"
+        url = f"/repos/{owner}/{repo}/git/refs/heads/{branch}"
         
         headers = {
             "Accept": "application/vnd.github.v3+json",
             "Authorization": f"Bearer {access_token}"
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                url,
-                headers=headers,
-                timeout=30.0
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                return data["object"]["sha"]
-            else:
-                logger.error(f"Failed to get branch HEAD: {response.status_code} - {response.text}")
-                return None
+        response = await self._request(
+            "GET",
+            url,
+            headers=headers,
+            timeout=30.0
+        )
+        
+        if response.status_code == 200:
+            data = orjson.loads(response.content)
+            return data["object"]["sha"]
+        else:
+            logger.error(f"Failed to get branch HEAD: {response.status_code} - {response.text}")
+            return None
     
     async def get_file_sha(
         self,
@@ -251,7 +477,7 @@ class GitHubService:
         access_token: str
     ) -> Optional[str]:
         """Get the SHA of a file in a repository"""
-        url = f"https://api.github.com/repos/{owner}/{repo}/contents/{file_path}"
+        url = f"/repos/{owner}/{repo}/contents/{file_path}"
         
         headers = {
             "Accept": "application/vnd.github.v3+json",
@@ -260,18 +486,11 @@ class GitHubService:
         
         params = {"ref": branch}
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                url,
-                headers=headers,
-                params=params,
-                timeout=30.0
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                return data.get("sha")
-            return None
+        status, data = await self._get_json_conditional(url, headers, params)
+        
+        if status == 200:
+            return data.get("sha")
+        return None
     
     async def get_file_content_with_sha(
         self,
@@ -282,7 +501,7 @@ class GitHubService:
         access_token: str
     ) -> Optional[Tuple[str, str]]:
         """Get file content and SHA together"""
-        url = f"https://api.github.com/repos/{owner}/{repo}/contents/{file_path}"
+        url = f"/repos/{owner}/{repo}/contents/{file_path}"
         
         headers = {
             "Accept": "application/vnd.github.v3+json",
@@ -291,19 +510,25 @@ class GitHubService:
         
         params = {"ref": branch}
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
+        status, data = await self._get_json_conditional(url, headers, params)
+        
+        if status != 200:
+            return None
+        
+        if data.get("encoding") == "base64":
+            # GitHub line-wraps the base64 payload; decodebytes is built for that input
+            content = base64.decodebytes(data["content"].encode("ascii")).decode('utf-8')
+        else:
+            # Files over 1 MB come back without inline content; stream the raw body instead
+            content = await self._download_raw(
                 url,
-                headers=headers,
                 params=params,
-                timeout=30.0
+                headers={**headers, "Accept": "application/vnd.github.v3.raw"}
             )
-            
-            if response.status_code == 200:
-                data = response.json()
-                content = base64.b64decode(data["content"]).decode('utf-8')
-                return (content, data["sha"])
-            return None
+            if content is None:
+                return None
+        
+        return (content, data["sha"])
     
     async def update_file(
         self,
@@ -317,7 +542,7 @@ class GitHubService:
         sha: str
     ) -> Optional[Dict[str, Any]]:
         """Update a file in the repository"""
-        url = f"https://api.github.com/repos/{owner}/{repo}/contents/{file_path}"
+        url = f"/repos/{owner}/{repo}/contents/{file_path}"
         
         headers = {
             "Accept": "application/vnd.github.v3+json",
@@ -334,19 +559,121 @@ class GitHubService:
             "sha": sha
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.put(
-                url,
-                json=payload,
-                headers=headers,
-                timeout=30.0
-            )
-            
-            if response.status_code in [200, 201]:
-                return response.json()
-            else:
-                logger.error(f"Failed to update file {file_path}: {response.status_code} - {response.text}")
-                return None
+        response = await self._request(
+            "PUT",
+            url,
+            content=orjson.dumps(payload),
+            headers=headers,
+            timeout=30.0
+        )
+        
+        if response.status_code in [200, 201]:
+            return orjson.loads(response.content)
+        else:
+            logger.error(f"Failed to update file {file_path}: {response.status_code} - {response.text}")
+            return None
+    
+    async def commit_tree(
+        self,
+        owner: str,
+        repo: str,
+        base_sha: str,
+        files: Dict[str, str],
+        message: str,
+        access_token: str
+    ) -> Optional[str]:
+        """
+        Commit several file contents on top of base_sha in one commit via the Git Data API.
+        Two calls regardless of file count: the tree (blobs are created inline from
+        'content') and the commit. Returns the new commit SHA; point a ref at it afterwards.
+        """
+        headers = {
+            "Accept": "application/vnd.github.v3+json",
+            "Authorization": f"Bearer {access_token}",
+            "Content-Type": "application/json"
+        }
+        
+        # Keep each file's mode from the base tree so scripts like mvnw stay executable
+        modes = await self._get_blob_modes(owner, repo, base_sha, headers)
+        
+        tree_payload = {
+            "base_tree": base_sha,
+            "tree": [
+                {"path": file_path, "mode": modes.get(file_path, "100644"), "type": "blob", "content": content}
+                for file_path, content in files.items()
+            ]
+        }
+        
+        response = await self._request(
+            "POST",
+            f"/repos/{owner}/{repo}/git/trees",
+            content=orjson.dumps(tree_payload),
+            headers=headers,
+            timeout=60.0
+        )
+        
+        if response.status_code != 201:
+            logger.error(f"Failed to create tree: {response.status_code} - {response.text}")
+            return None
+        
+        tree_sha = orjson.loads(response.content)["sha"]
+        
+        commit_payload = {
+            "message": message,
+            "tree": tree_sha,
+            "parents": [base_sha]
+        }
+        
+        response = await self._request(
+            "POST",
+            f"/repos/{owner}/{repo}/git/commits",
+            content=orjson.dumps(commit_payload),
+            headers=headers,
+            timeout=30.0
+        )
+        
+        if response.status_code != 201:
+            logger.error(f"Failed to create commit: {response.status_code} - {response.text}")
+            return None
+        
+        return orjson.loads(response.content)["sha"]
+    
+    async def _get_blob_modes(
+        self,
+        owner: str,
+        repo: str,
+        tree_ish: str,
+        headers: Dict[str, str]
+    ) -> Dict[str, str]:
+        """
+        Map path -> mode of the executable files in tree_ish (recursive listing).
+        Every other file (and anything missing from a truncated listing) is a plain 100644 blob.
+        """
+        response = await self._request(
+            "GET",
+            f"/repos/{owner}/{repo}/git/trees/{tree_ish}",
+            params={"recursive": "1"},
+            headers=headers,
+            timeout=30.0
+        )
+        
+        if response.status_code != 200:
+            logger.warning(f"Could not list tree {tree_ish[:7]}: {response.status_code}, assuming mode 100644")
+            return {}
+        
+        return {
+            entry["path"]: entry["mode"]
+            for entry in orjson.loads(response.content).get("tree", [])
+            if entry.get("mode") == "100755"
+        }
+    
+    async def parse_unified_diff_async(self, diff_text: str) -> List[Dict[str, Any]]:
+        """parse_unified_diff on a worker thread so large diffs don't stall the event loop"""
+        return await asyncio.to_thread(self.parse_unified_diff, diff_text)
+    
+    async def apply_diff_to_content_async(self, original_content: str, diff_hunks: List[str]) -> str:
+        """apply_diff_to_content on a worker thread"""
+        return await asyncio.to_thread(self.apply_diff_to_content, original_content, diff_hunks)
     
     def parse_unified_diff(self, diff_text: str) -> List[Dict[str, Any]]:
         """
@@ -354,55 +681,56 @@ class GitHubService:
         Returns list of: [{"file_path": str, "changes": [(line_num, old_line, new_line), ...]}, ...]
         """
         # Remove markdown code blocks if present
-        diff_text = re.sub(r'^```diff\s*\n', '', diff_text, flags=re.MULTILINE)
-        diff_text = re.sub(r'\n```\s*$', '', diff_text, flags=re.MULTILINE)
-        
-        file_changes = []
-        current_file = None
-        current_changes = []
-        
-        lines = diff_text.split('\n')
-        i = 0
-        
-        while i < len(lines):
-            line = lines[i]
-            
-            # Detect file header: --- a/path/to/file.java
-            if line.startswith('--- '):
-                # Save previous file if exists
-                if current_file:
-                    file_changes.append({
-                        "file_path": current_file,
-                        "full_content": current_changes
-                    })
+        diff_text = _FENCE_OPEN.sub('', diff_text)
+        diff_text = _FENCE_CLOSE.sub('', diff_text)
+        
+        # Only the pull-request path parses diffs; keep unidiff off the startup import path
+        from unidiff import PatchSet, UnidiffParseError
+        
+        try:
+            patch = PatchSet.from_string(diff_text)
+        except UnidiffParseError:
+            # LLM-written diffs often have hunk counts that don't add up
+            patch = None
+        
+        if patch:
+            file_changes = []
+            for patched_file in patch:
+                if patched_file.is_binary_file:
+                    continue
                 
-                # Extract file path (remove 'a/' or 'b/' prefix)
-                file_path = line[4:].strip()
-                if file_path.startswith('a/'):
+                # Extract file path (remove 'b/' prefix)
+                file_path = patched_file.target_file
+                if file_path.startswith('b/'):
                     file_path = file_path[2:]
                 
-                # Get the +++ line
-                i += 1
-                if i < len(lines) and lines[i].startswith('+++ '):
-                    new_path = lines[i][4:].strip()
-                    if new_path.startswith('b/'):
-                        new_path = new_path[2:]
-                    current_file = new_path
-                    current_changes = []
+                full_content = []
+                for hunk in patched_file:
+                    full_content.extend(str(hunk).rstrip('\n').split('\n'))
+                
+                file_changes.append({
+                    "file_path": file_path,
+                    "full_content": full_content
+                })
+            return file_changes
+        
+        # One pass in the regex engine: each file starts at a '--- ' line immediately
+        # followed by a '+++ ' line, and its body runs up to the next such header
+        headers = list(_DIFF_FILE_HEADER.finditer(diff_text))
+        file_changes = []
+        
+        for idx, header in enumerate(headers):
+            # Extract file path (remove 'b/' prefix)
+            file_path = header.group("new").strip()
+            if file_path.startswith('b/'):
+                file_path = file_path[2:]
             
-            # Collect the actual diff content
-            elif current_file and (line.startswith('-') or line.startswith('+') or line.startswith('@@')):
-                current_changes.append(line)
-            elif current_file:
-                current_changes.append(line)
+            body_start = header.end() + 1
+            body_end = headers[idx + 1].start() - 1 if idx + 1 < len(headers) else len(diff_text)
             
-            i += 1
-        
-        # Save last file
-        if current_file:
             file_changes.append({
-                "file_path": current_file,
-                "full_content": current_changes
+                "file_path": file_path,
+                "full_content": diff_text[body_start:body_end].split('\n') if body_end > body_start else []
             })
         
         return file_changes
@@ -410,10 +738,14 @@ class GitHubService:
     def apply_diff_to_content(self, original_content: str, diff_hunks: List[str]) -> str:
         """
         Apply unified diff hunks to original file content
-        Simple line-based replacement
+        Hunks are applied by position when their line numbers line up with the file,
+        otherwise falls back to a simple line-based replacement
         """
         lines = original_content.split('\n')
-        new_lines = lines.copy()
+        
+        positional = self._apply_hunks_by_position(lines, diff_hunks)
+        if positional is not None:
+            return '\n'.join(positional)
         
         # Extract changes from diff hunks
         removals = []
@@ -425,16 +757,14 @@ class GitHubService:
             elif hunk.startswith('+') and not hunk.startswith('+++'):
                 additions.append(hunk[1:])  # Remove '+' prefix
         
-        # Simple approach: replace lines that match removals with additions
+        # Simple approach: replace lines that match removals with the addition at the
+        # same index. Removals are matched in order with a forward cursor, so each one
+        # can only match after the previous match.
         # For complex diffs, you might need a proper diff/patch library
         result_lines = []
-        i = 0
         removal_idx = 0
         
-        while i < len(new_lines):
-            line = new_lines[i]
-            
-            # Check if this line should be removed
+        for line in lines:
             if removal_idx < len(removals) and line == removals[removal_idx]:
                 # Skip removed line, add corresponding addition if exists
                 if removal_idx < len(additions):
@@ -442,15 +772,66 @@ class GitHubService:
                 removal_idx += 1
             else:
                 result_lines.append(line)
-            
-            i += 1
         
-        # Add any remaining additions
-        while removal_idx < len(additions):
-            result_lines.append(additions[removal_idx])
-            removal_idx += 1
+        # Add any remaining additions (unpaired, or whose removal wasn't found)
+        result_lines.extend(additions[removal_idx:])
         
         return '\n'.join(result_lines)
 
+    @staticmethod
+    def _apply_hunks_by_position(lines: List[str], diff_hunks: List[str]) -> Optional[List[str]]:
+        """
+        Splice each hunk in at its source_start, O(N) over the file.
+        Returns None if any hunk's context/removals don't match the file at that position.
+        """
+        hunks = []  # (begin index, source lines, target lines)
+        i = 0
+        while i < len(diff_hunks):
+            header = _HUNK_HEADER.match(diff_hunks[i])
+            i += 1
+            if not header:
+                continue
+            
+            source_start = int(header.group(1))
+            source_count = int(header.group(2) or 1)
+            target_count = int(header.group(3) or 1)
+            source, target = [], []
+            
+            while i < len(diff_hunks) and (len(source) < source_count or len(target) < target_count):
+                line = diff_hunks[i]
+                i += 1
+                if line.startswith('-'):
+                    source.append(line[1:])
+                elif line.startswith('+'):
+                    target.append(line[1:])
+                elif line.startswith('\\'):
+                    continue  # '\ No newline at end of file'
+                else:
+                    # Context line (editors sometimes strip the leading space of blank lines)
+                    source.append(line[1:])
+                    target.append(line[1:])
+            
+            if len(source) != source_count or len(target) != target_count:
+                return None
+            
+            # A pure insertion ('-N,0') goes after line N
+            hunks.append((source_start - 1 if source_count else source_start, source, target))
+        
+        if not hunks:
+            return None
+        
+        result = []
+        cursor = 0
+        for begin, source, target in sorted(hunks, key=lambda h: h[0]):
+            if begin < cursor or lines[begin:begin + len(source)] != source:
+                return None
+            result.extend(lines[cursor:begin])
+            result.extend(target)
+            cursor = begin + len(source)
+        result.extend(lines[cursor:])
+        
+        return result
+
+
 # Global instance
 github_service = GitHubService()
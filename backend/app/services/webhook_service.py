@@ -7,70 +7,257 @@ from app.repositories.user_repository import user_repo
 from app.repositories.repo_repository import repository_repo
 from app.repositories.change_repository import change_repo
 from app.services.github_service import github_service
+from app.core.config import settings
 from app.utils.logger import logger
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
+from pathlib import Path
+from typing import Dict, List, Optional
 import asyncio
+import os
+import shutil
+import time
 
 # Flag to enable/disable recipe-based agent (set to True to use recipes first)
 USE_RECIPE_AGENT = True
 
 class WebhookService:
 
+    POLL_INTERVAL = 5  # Seconds an idle worker waits before re-checking the queue
+    HEARTBEAT_INTERVAL = 60  # Seconds between updated_at bumps of a running change
+    STALE_JOB_SECONDS = 10 * 60  # No heartbeat for this long: the run was interrupted
+    SWEEP_INTERVAL = 2 * 60  # Seconds between sweeps for interrupted runs
+    REPO_CACHE_DIR = Path.home() / ".cache" / "aura" / "repos"  # Bare repos reused across runs
+    REPO_CACHE_TTL = 7 * 24 * 3600  # Cached repos untouched for this long are evicted
+    CACHE_EVICT_INTERVAL = 3600  # Seconds between eviction passes over the repo cache
+    CACHE_REF = "refs/aura/latest"  # Keeps the last fetched commit reachable in the cache
+    MAX_ERROR_CHARS = 64 * 1024  # Initial compile errors kept for the agents (head of the log)
+
+    def __init__(self):
+        # Pending changes in MongoDB are the job queue (survives restarts); a fixed pool
+        # of workers claims them one at a time, so a burst of pushes can't spawn unbounded
+        # concurrent clones, Maven containers and LLM calls
+        self._workers: List[asyncio.Task] = []
+        self._sweeper: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        # One lock per cached bare repo: fetches into it and clones from it are serialized.
+        # Entries are [lock, users] and dropped once no run holds or waits on the lock
+        self._repo_locks: Dict[str, list] = {}
+        # Dedicated threads for the long blocking steps (clone, Maven, recipe/LLM agents),
+        # two per worker (compile and pom diff overlap), so minutes-long runs never tie up
+        # the default to_thread executor
+        self._agent_pool = ThreadPoolExecutor(
+            max_workers=settings.WEBHOOK_WORKERS * 2,
+            thread_name_prefix="aura-agent"
+        )
+        # Built on first use and shared by every run: both only hold immutable setup
+        # (LLM clients, loaded recipes, rendered prompts), so per-run state stays local
+        self._orchestrator = None
+        self._agent_service = None
+
+    async def start(self):
+        """Start the stale-run sweeper and the agent worker pool (called on application startup)"""
+        self._sweeper = asyncio.create_task(self._requeue_stale_loop())
+        self._workers = [
+            asyncio.create_task(self._worker(worker_id))
+            for worker_id in range(settings.WEBHOOK_WORKERS)
+        ]
+        logger.info("Started %s webhook workers", len(self._workers))
+
+    async def stop(self):
+        """Cancel the worker pool (called on application shutdown)"""
+        tasks = [*self._workers, self._sweeper] if self._sweeper else self._workers
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+        self._sweeper = None
+        self._agent_pool.shutdown(wait=False, cancel_futures=True)
+
+    def _get_orchestrator(self):
+        """Shared RecipeOrchestrator, created on first use"""
+        if self._orchestrator is None:
+            from app.recipe_agent import RecipeOrchestrator
+            self._orchestrator = RecipeOrchestrator(settings.GROQ_API_KEY)
+        return self._orchestrator
+
+    def _get_agent_service(self):
+        """Shared JavaMigrationAgentService, created on first use"""
+        if self._agent_service is None:
+            from app.agents.service import JavaMigrationAgentService
+            self._agent_service = JavaMigrationAgentService(settings.GROQ_API_KEY)
+        return self._agent_service
+
+    async def _run_blocking(self, func, *args, **kwargs):
+        """Run a blocking agent step on the dedicated agent pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._agent_pool, partial(func, *args, **kwargs))
+
+    async def _requeue_stale_loop(self):
+        """
+        Periodically requeue runs whose worker stopped heartbeating (crash, restart, other
+        instance), and every CACHE_EVICT_INTERVAL evict repos nobody pushed to in a while
+        """
+        last_eviction = 0.0
+        while True:
+            try:
+                requeued = await change_repo.requeue_stale(self.STALE_JOB_SECONDS)
+                if requeued:
+                    logger.info("Requeued %s interrupted changes", requeued)
+                    self._wakeup.set()
+            except Exception as e:
+                logger.error("Failed to requeue stale changes: %s", e)
+            
+            if time.monotonic() - last_eviction >= self.CACHE_EVICT_INTERVAL:
+                last_eviction = time.monotonic()
+                try:
+                    await self._evict_repo_cache()
+                except Exception as e:
+                    logger.error("Failed to evict cached repos: %s", e)
+            
+            await asyncio.sleep(self.SWEEP_INTERVAL)
+
+    async def _evict_repo_cache(self):
+        """Remove cached bare repos unused for REPO_CACHE_TTL, each under its repo lock"""
+        for repo_slug in await self._run_blocking(self._expired_cache_slugs, self.REPO_CACHE_DIR, self.REPO_CACHE_TTL):
+            async with self._repo_lock(repo_slug):
+                cache_path = self.REPO_CACHE_DIR / f"{repo_slug}.git"
+                # A run may have refreshed it while we waited for the lock
+                if cache_path.exists() and time.time() - cache_path.stat().st_mtime >= self.REPO_CACHE_TTL:
+                    await self._run_blocking(shutil.rmtree, cache_path, ignore_errors=True)
+                    logger.info("Evicted cached repo %s", repo_slug)
+
+    @staticmethod
+    def _expired_cache_slugs(cache_dir: Path, ttl: int) -> List[str]:
+        """owner/repo slugs of cached repos whose last use is older than ttl (blocking)"""
+        if not cache_dir.exists():
+            return []
+        cutoff = time.time() - ttl
+        return [
+            path.relative_to(cache_dir).as_posix()[:-len(".git")]
+            for path in cache_dir.glob("*/*.git")
+            if path.stat().st_mtime < cutoff
+        ]
+
+    async def _heartbeat(self, change_id: str):
+        """Keep a running change's updated_at fresh so the sweeper leaves it alone"""
+        while True:
+            await asyncio.sleep(self.HEARTBEAT_INTERVAL)
+            try:
+                await change_repo.touch(change_id)
+            except Exception as e:
+                logger.warning("Heartbeat for change %s failed: %s", change_id, e)
+
+    @asynccontextmanager
+    async def _repo_lock(self, repo_slug: str):
+        """Hold the cached repo's lock; the entry is evicted once nobody holds or awaits it"""
+        entry = self._repo_locks.get(repo_slug)
+        if entry is None:
+            entry = self._repo_locks[repo_slug] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._repo_locks[repo_slug]
+
+    async def _worker(self, worker_id: int):
+        while True:
+            # Clear before claiming so a notify that lands after an empty claim isn't lost
+            self._wakeup.clear()
+            try:
+                change = await change_repo.claim_next_pending()
+            except Exception as e:
+                # A transient Mongo error must not end the worker; back off and retry
+                logger.error("Webhook worker %s could not claim a change: %s", worker_id, e)
+                await asyncio.sleep(self.POLL_INTERVAL)
+                continue
+            if not change:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            
+            try:
+                repository = await repository_repo.find_by_id(change.repository_id)
+                if not repository:
+                    await change_repo.save_error(change.id, "Repository no longer exists")
+                    continue
+                
+                heartbeat = asyncio.create_task(self._heartbeat(change.id))
+                try:
+                    await self._run_agent_background(
+                        change_id=change.id,
+                        repo_url=f"https://github.com/{repository.full_name}.git",
+                        commit_sha=change.commit_sha,
+                        repo_slug=repository.full_name
+                    )
+                finally:
+                    heartbeat.cancel()
+            except Exception as e:
+                logger.error("Webhook worker %s failed on change %s: %s", worker_id, change.id, e, exc_info=True)
+
     async def process_webhook(self,repo_data, owner_data, commit_with_pom, installation_id):
+        """Record the push's user, repository and pending change (runs after the webhook response)"""
+        try:
+            return await self._record_push(repo_data, owner_data, commit_with_pom, installation_id)
+        except Exception as e:
+            # Nothing is waiting on this task, so log instead of raising into the ASGI server
+            logger.error("Failed to record webhook push %s: %s", commit_with_pom.get('id'), e, exc_info=True)
+            return None
+
+    async def _record_push(self, repo_data, owner_data, commit_with_pom, installation_id):
+
+        # Read each payload field once; the user, repository and change share them
+        owner_id = str(owner_data.get("id"))
+        owner_login = owner_data.get("login")
+        commit_sha = commit_with_pom.get("id")
 
         user = User(
-            github_id=str(owner_data.get("id")),
-            username=owner_data.get("login"),
+            github_id=owner_id,
+            username=owner_login,
             avatar_url=owner_data.get("avatar_url"),
             email=None,  # Not available in webhook
             repositories=[]
                     )
         
-        user_id = await user_repo.create_or_update(user)
-
-        
         repository = Repository(
             github_repo_id=str(repo_data.get("id")),
             name=repo_data.get("name"),
             full_name=repo_data.get("full_name"),
-            owner=owner_data.get("login"),
-            owner_id=str(owner_data.get("id")),
+            owner=owner_login,
+            owner_id=owner_id,
             installation_id=installation_id,
             is_active=True,
-            last_commit_sha=commit_with_pom.get("id"),
+            last_commit_sha=commit_sha,
             last_pom_change=datetime.utcnow()
         )
 
         repo_id = await repository_repo.create_or_update(repository)
 
-        await user_repo.add_repository(user.github_id, repo_id)
-        
         # Create Change record (will fetch pom.xml after cloning)
         change = Change(
             repository_id=repo_id,
-            commit_sha=commit_with_pom.get("id"),
+            commit_sha=commit_sha,
             commit_message=commit_with_pom.get("message"),
             pom_content="",  # Will be populated after cloning
             status=FixStatus.PENDING
         )
         
-        change_id = await change_repo.create(change)
-        logger.info(f"Change created: {change_id}")
-        
-        # Trigger agent in background
-        asyncio.create_task(
-            self._run_agent_background(
-                change_id=change_id,
-                repo_url=f"https://github.com/{repository.full_name}.git",
-                commit_sha=commit_with_pom.get("id"),
-                repo_slug=repository.full_name,
-                user_id=user_id,
-                repo_id=repo_id,
-                user= user,
-                repository=repository,
-                commit_with_pom=commit_with_pom
-
-            )
+        # Both writes only need repo_id: upsert the user (linking the repository in the
+        # same write) and insert the change concurrently
+        user_id, change_id = await asyncio.gather(
+            user_repo.create_or_update(user, add_repo_id=repo_id),
+            change_repo.create(change)
         )
+        logger.info("Change created: %s", change_id)
+        
+        # The pending change is the queued job; wake an idle worker to claim it
+        self._wakeup.set()
 
         return {
             "status": "success",
@@ -87,7 +274,7 @@ class WebhookService:
             "change": {
                 "id": change_id,
                 "status": "pending",
-                "commit": commit_with_pom.get("id")[:7]
+                "commit": commit_sha[:7]
             }
         }
     
@@ -96,56 +283,44 @@ class WebhookService:
         change_id: str,
         repo_url: str,
         commit_sha: str,
-        repo_slug: str,
-        user_id,
-        repo_id,
-        user,
-        repository,
-        commit_with_pom
+        repo_slug: str
     ):
         """Run agent in background - tries recipe-based fix first, then falls back to existing agent"""
+        cache_path = self.REPO_CACHE_DIR / f"{repo_slug}.git"
+        temp_dir = None
         try:
             from app.agents.callback import AgentCallback
-            from app.agents.service import JavaMigrationAgentService
-            from app.core.config import settings
             import tempfile
-            import git
-            from pathlib import Path
             
             callback = AgentCallback(change_id)
             
             # Update status: cloning
             await callback.update_status("cloning", 5, "Cloning repository...")
             
-            # Clone repo
+            # Fetch into the cached bare repo, then copy the commit into a standalone clone:
+            # repeat pushes to the same repo only download the delta instead of cloning again
             temp_dir = tempfile.mkdtemp(prefix="aura_repo_")
             repo_path = f"{temp_dir}/repo"
             
-            logger.info(f"Cloning {repo_url} to {repo_path}")
-            repo = git.Repo.clone_from(repo_url, repo_path)
-            repo.git.checkout(commit_sha)
+            logger.info("Fetching %s@%s into %s", repo_url, commit_sha[:7], repo_path)
+            # git, Maven and the agent are all blocking; run them on the agent pool so
+            # one webhook's clone/compile doesn't stall every other request
+            async with self._repo_lock(repo_slug):
+                repo = await self._run_blocking(self._checkout_from_cache, repo_url, cache_path, repo_path, commit_sha)
             
             # Read pom.xml content from cloned repo
             pom_file_path = Path(repo_path) / "pom.xml"
             if pom_file_path.exists():
-                pom_content = pom_file_path.read_text(encoding="utf-8")
-                # Update change record with pom content
+                pom_content = pom_file_path.read_bytes().decode("utf-8")
+                # Update change record with status and pom content in one write
                 await callback.update_status(
                     "cloning", 
                     progress=5,
-                    message="Repository cloned, pom.xml loaded"
-                )
-                # Update pom_content separately
-                from app.repositories.change_repository import change_repo
-                await change_repo.update_status(
-                    change_id, 
-                    FixStatus.CLONING, 
-                    progress=5,
-                    message="Repository cloned",
+                    message="Repository cloned, pom.xml loaded",
                     pom_content=pom_content
                 )
             else:
-                logger.error(f"pom.xml not found in {repo_path}")
+                logger.error("pom.xml not found in %s", repo_path)
                 await callback.save_error("pom.xml not found in repository")
                 return
             
@@ -154,21 +329,15 @@ class WebhookService:
             
             # Get initial errors (compile without changes)
             from app.common_agents.agent.MavenReproducerAgent import MavenReproducerAgent
-            from pathlib import Path
             
             maven_agent = MavenReproducerAgent(Path(repo_path))
-            with maven_agent.start_container():
-                (compile_ok, test_ok), error_text, _ = maven_agent.compile_maven(
-                    diffs=[],
-                    run_tests=False,
-                    timeout=300
-                )
-            
-            initial_errors = error_text if not compile_ok else ""
             
-            # Get pom.xml diff to understand what changed
-            git_repo = git.Repo(repo_path)
-            pom_diff = git_repo.git.diff(f"{commit_sha}~1", commit_sha, "--", "pom.xml")
+            # Get pom.xml diff to understand what changed (reuse the handle from the clone);
+            # it only reads git objects, so it runs alongside the compile
+            initial_errors, pom_diff = await asyncio.gather(
+                self._run_blocking(self._compile_initial, maven_agent),
+                self._run_blocking(repo.git.diff, f"{commit_sha}~1", commit_sha, "--", "pom.xml")
+            )
             
             # ========================================
             # RECIPE-BASED AGENT (runs BEFORE existing agent)
@@ -187,7 +356,7 @@ class WebhookService:
                 
                 if recipe_result and recipe_result.get("success"):
                     # Recipe-based fix succeeded!
-                    logger.info(f"[RecipeAgent] Successfully fixed using recipes for change {change_id}")
+                    logger.info("[RecipeAgent] Successfully fixed using recipes for change %s", change_id)
                     await callback.save_result(
                         diff=recipe_result.get("diff", ""),
                         solution=f"Fixed using OpenRewrite recipes: {recipe_result.get('recipes_applied', [])}",
@@ -195,7 +364,7 @@ class WebhookService:
                     )
                     return
                 else:
-                    logger.info(f"[RecipeAgent] Recipe-based fix not applicable or failed, falling back to existing agent")
+                    logger.info("[RecipeAgent] Recipe-based fix not applicable or failed, falling back to existing agent")
             
             # ========================================
             # EXISTING AGENT (fallback)
@@ -204,9 +373,10 @@ class WebhookService:
             await callback.update_status("analyzing", 20, "Agent starting analysis...")
             
             # Run agent
-            agent_service = JavaMigrationAgentService(settings.GROQ_API_KEY)
+            agent_service = self._get_agent_service()
             
-            result = agent_service.process_repository(
+            result = await self._run_blocking(
+                agent_service.process_repository,
                 repo_path=repo_path,
                 commit_hash=commit_sha,
                 repo_slug=repo_slug,
@@ -219,30 +389,89 @@ class WebhookService:
                     diff=result["diff"],
                     solution=result["solution"]
                 )
-                logger.info(f"Agent completed successfully for change {change_id}")
+                logger.info("Agent completed successfully for change %s", change_id)
             else:
                 await callback.save_error(result.get("error", "Unknown error"))
-                logger.error(f"Agent failed for change {change_id}")
+                logger.error("Agent failed for change %s", change_id)
                 
         except Exception as e:
-            logger.error(f"Error running agent: {str(e)}", exc_info=True)
+            logger.error("Error running agent: %s", e, exc_info=True)
             await callback.save_error(str(e))
+        finally:
+            if temp_dir:
+                await self._run_blocking(shutil.rmtree, temp_dir, ignore_errors=True)
 
-        return {
-            "user": {
-                "id": user_id,
-                "username": user.username
-            },
-            "repository": {
-                "id": repo_id,
-                "name": repository.name,
-                "full_name": repository.full_name
-            },
-            "commit": {
-                "sha": commit_with_pom.get("id")[:7],
-                "message": commit_with_pom.get("message")
-            }
-        }
+    @classmethod
+    def _checkout_from_cache(cls, repo_url: str, cache_path: Path, repo_path: str, commit_sha: str):
+        """
+        Fetch just the pushed commit and its parent (enough for the pom.xml diff) into the
+        cached bare repo, then copy them into a standalone clone at repo_path (blocking).
+        The clone has its own .git directory, so git keeps working inside the Maven
+        container, which only mounts repo_path.
+        """
+        import git
+        
+        try:
+            cache = cls._open_cache(repo_url, cache_path)
+            cache.git.fetch("origin", f"+{commit_sha}:{cls.CACHE_REF}", depth=2, no_tags=True)
+        except git.GitCommandError as e:
+            # A corrupt cache (e.g. a fetch killed midway) would fail every run; rebuild it
+            logger.warning("Rebuilding repo cache %s: %s", cache_path, e)
+            shutil.rmtree(cache_path, ignore_errors=True)
+            cache = cls._open_cache(repo_url, cache_path)
+            cache.git.fetch("origin", f"+{commit_sha}:{cls.CACHE_REF}", depth=2, no_tags=True)
+        cache.git.gc("--auto", "--quiet")  # drops commits of older runs once they pile up
+        os.utime(cache_path)  # mtime marks last use for eviction
+        
+        repo = git.Repo.init(repo_path)
+        repo.create_remote("origin", repo_url)
+        repo.git.fetch(cache_path.as_uri(), cls.CACHE_REF, depth=2, no_tags=True)
+        repo.git.checkout(commit_sha)
+        return repo
+
+    @staticmethod
+    def _open_cache(repo_url: str, cache_path: Path):
+        """Open the cached bare repo, recreating it if missing or left half-initialized"""
+        import git
+        
+        try:
+            cache = git.Repo(cache_path)
+            if cache.bare and cache.remotes.origin.url == repo_url:
+                cache.git.update_environment(GIT_TERMINAL_PROMPT="0")
+                return cache
+        except (git.InvalidGitRepositoryError, git.NoSuchPathError, AttributeError, ValueError):
+            pass
+        
+        shutil.rmtree(cache_path, ignore_errors=True)
+        cache = git.Repo.init(cache_path, bare=True, mkdir=True)
+        cache.create_remote("origin", repo_url)
+        cache.git.update_environment(GIT_TERMINAL_PROMPT="0")  # fail fast instead of prompting
+        return cache
+
+    @classmethod
+    def _compile_initial(cls, maven_agent) -> str:
+        """Compile the untouched project and return its errors, or "" if it builds (blocking)"""
+        with maven_agent.start_container():
+            (compile_ok, test_ok), error_text, _ = maven_agent.compile_maven(
+                diffs=[],
+                run_tests=False,
+                timeout=300
+            )
+        
+        if compile_ok:
+            return ""
+        
+        # When Maven's [ERROR] lines can't be isolated this is the whole build log; it's
+        # held for the rest of the run and sent to the LLMs, so keep only the useful head
+        if len(error_text) > cls.MAX_ERROR_CHARS:
+            error_text = "\n".join(
+                line for line in error_text.split("\n")
+                if "Downloading" not in line and "Downloaded" not in line
+            )
+        if len(error_text) > cls.MAX_ERROR_CHARS:
+            error_text = error_text[:cls.MAX_ERROR_CHARS] + "\n... (compile output truncated)"
+        
+        return error_text
 
     async def _try_recipe_based_fix(
         self,
@@ -261,15 +490,15 @@ class WebhookService:
             dict with 'success', 'diff', 'recipes_applied' or None if not applicable
         """
         try:
-            from app.recipe_agent import RecipeOrchestrator
-            from app.core.config import settings
-            
             logger.info("[RecipeAgent] Starting recipe-based analysis...")
             await callback.update_status("analyzing", 16, "Analyzing with OpenRewrite recipes...")
             
-            orchestrator = RecipeOrchestrator(settings.GROQ_API_KEY)
+            orchestrator = self._get_orchestrator()
             
-            result = orchestrator.process_breaking_change(
+            # The recipe pipeline is synchronous (LLM call, Maven Central lookups, Docker);
+            # run it on the agent pool so the event loop keeps serving requests
+            result = await self._run_blocking(
+                orchestrator.process_breaking_change,
                 repo_path=repo_path,
                 pom_diff=pom_diff,
                 compilation_errors=initial_errors,
@@ -281,11 +510,11 @@ class WebhookService:
                 await callback.update_status("fixing", 80, "Recipe-based fix applied successfully!")
                 return result
             else:
-                logger.info(f"[RecipeAgent] Recipe result: {result.get('message', 'No message')}")
+                logger.info("[RecipeAgent] Recipe result: %s", result.get('message', 'No message'))
                 return result
                 
         except Exception as e:
-            logger.error(f"[RecipeAgent] Error in recipe-based fix: {e}", exc_info=True)
+            logger.error("[RecipeAgent] Error in recipe-based fix: %s", e, exc_info=True)
             return {
                 "success": False,
                 "used_recipes": False,
@@ -13,6 +13,10 @@ logging.basicConfig(
 
 logger = logging.getLogger("aura")
 
+def get_logger(name: str = None) -> logging.Logger:
+    """Return the app logger, or a named child of it (e.g. "aura.maven")"""
+    return logger.getChild(name) if name else logger
+
 def setup_logging():
     """Configure application logging"""
     pass
@@ -1,12 +1,30 @@
 """
 Maven Central Verification Tool
 Verifies dependency versions against Maven Central before writing rewrite.yaml or diffs.
-Uses the Maven Central Search API (no authentication required).
+Reads the repository itself (repo1.maven.org) and falls back to the
+Maven Central Search API (no authentication required).
 """
 
+import atexit
+import re
+import threading
+import time
+import orjson
 import requests
-from typing import Optional
-from app.utils.logger import logger
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from pathlib import Path
+from typing import List, Optional, Tuple
+from app.utils.logger import get_logger
+
+# Lookups run per dependency; log with %-args so disabled levels cost no formatting
+logger = get_logger("maven")
+
+# Version shapes that have an X.Y <-> X.Y.0 alternative
+_VERSION_TWO_PART = re.compile(r"^\d+\.\d+$")
+_VERSION_THREE_PART_DOT0 = re.compile(r"^(\d+\.\d+)\.0$")
 
 
 class MavenCentralTool:
@@ -18,8 +36,30 @@ class MavenCentralTool:
     whether a version string actually exists for a given artifact.
     """
 
+    REPO_URL = "https://repo1.maven.org/maven2"
     SEARCH_URL = "https://search.maven.org/solrsearch/select"
     REQUEST_TIMEOUT = 10  # seconds
+    CACHE_PATH = Path.home() / ".cache" / "aura" / "maven_central.json"
+    NEGATIVE_TTL = 24 * 3600  # seconds a "not found" answer is trusted
+    LATEST_TTL = 24 * 3600  # seconds a "latest version" answer is trusted
+    MAX_CONCURRENT_LOOKUPS = 8  # parallel lookups in resolve_many (<= session pool size)
+
+    def __init__(self):
+        # Lookups are memoized in memory and persisted across runs:
+        #   exists: "g:a:v" -> [found, fetched_at]  (found=True never expires; releases are immutable)
+        #   latest: "g:a"   -> [version, fetched_at]
+        self._cache = self._load_cache()
+        self._cache_dirty = False
+        self._cache_lock = threading.Lock()
+        atexit.register(self._save_cache)
+        # Pooled keep-alive session: reuses the TLS connection to search.maven.org
+        # and retries transient failures / throttling with backoff
+        self._session = requests.Session()
+        self._session.mount("https://", HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=20,
+            max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+        ))
 
     def resolve_correct_version(self, group_id: str, artifact_id: str, version: str) -> str:
         """
@@ -39,7 +79,7 @@ class MavenCentralTool:
             A verified version string that exists on Maven Central,
             or the original version as a last resort if the API is unreachable.
         """
-        dep_label = f"{group_id}:{artifact_id}:{version}"
+        original_version = version
         version = version.strip()
 
         # Strip leading 'v' prefix (e.g. "v2.1.0" -> "2.1.0")
@@ -48,30 +88,45 @@ class MavenCentralTool:
 
         # 1. Check if the exact requested version exists
         if self._check_version_exists(group_id, artifact_id, version):
-            logger.info(f"[MavenCentralTool] ✅ Version verified: {dep_label}")
+            logger.info("[MavenCentralTool] ✅ Version verified: %s:%s:%s", group_id, artifact_id, version)
             return version
 
         # 2. Try the alternative format (handle 2-digit vs 3-digit mismatch)
         alt_version = self._get_alternative_format(version)
         if alt_version and self._check_version_exists(group_id, artifact_id, alt_version):
-            logger.info(f"[MavenCentralTool] ✅ Corrected version: {group_id}:{artifact_id}:{version} -> {alt_version}")
+            logger.info("[MavenCentralTool] ✅ Corrected version: %s:%s:%s -> %s", group_id, artifact_id, version, alt_version)
             return alt_version
 
         # 3. Fallback: fetch the latest available version
         logger.warning(
-            f"[MavenCentralTool] ⚠️ Version '{version}'"
-            + (f" and '{alt_version}'" if alt_version else "")
-            + f" not found for {group_id}:{artifact_id}. Fetching latest..."
+            "[MavenCentralTool] ⚠️ Version '%s'%s not found for %s:%s. Fetching latest...",
+            version, f" and '{alt_version}'" if alt_version else "", group_id, artifact_id
         )
         latest = self._get_latest_version(group_id, artifact_id)
         if latest and latest != "LATEST":
-            logger.info(f"[MavenCentralTool] ✅ Using latest version: {group_id}:{artifact_id}:{latest}")
+            logger.info("[MavenCentralTool] ✅ Using latest version: %s:%s:%s", group_id, artifact_id, latest)
             return latest
 
         # 4. Absolute fallback — return the original version and let Maven try
-        logger.warning(f"[MavenCentralTool] ⚠️ Could not verify {dep_label}, using original value")
+        logger.warning("[MavenCentralTool] ⚠️ Could not verify %s:%s:%s, using original value", group_id, artifact_id, original_version)
         return version
 
+    def resolve_many(self, deps: List[Tuple[str, str, str]]) -> List[str]:
+        """
+        Resolve several (group_id, artifact_id, version) coordinates concurrently.
+        
+        Each lookup is network-bound, so they run on a small thread pool sharing the
+        pooled session; N dependencies take roughly one dependency's wall time.
+        
+        Returns:
+            Resolved versions, in the same order as ``deps``.
+        """
+        if len(deps) <= 1:
+            return [self.resolve_correct_version(g, a, v) for g, a, v in deps]
+
+        with ThreadPoolExecutor(max_workers=min(len(deps), self.MAX_CONCURRENT_LOOKUPS)) as pool:
+            return list(pool.map(lambda dep: self.resolve_correct_version(*dep), deps))
+
     # ------------------------------------------------------------------
     # Public helpers (useful for agents / tools)
     # ------------------------------------------------------------------
@@ -97,38 +152,88 @@ class MavenCentralTool:
             - "1.15.0" -> "1.15"
         Returns None if no alternative makes sense.
         """
-        if version.count('.') == 2 and version.endswith('.0'):
-            return version[:-2]       # 1.15.0 -> 1.15
-        elif version.count('.') == 1:
-            parts = version.split('.')
-            try:
-                int(parts[0])
-                int(parts[1])
-                return f"{version}.0"  # 1.15 -> 1.15.0
-            except ValueError:
-                return None
+        match = _VERSION_THREE_PART_DOT0.match(version)
+        if match:
+            return match.group(1)      # 1.15.0 -> 1.15
+        if _VERSION_TWO_PART.match(version):
+            return f"{version}.0"      # 1.15 -> 1.15.0
         return None
 
+    def _load_cache(self) -> dict:
+        """Load the on-disk lookup cache (empty on first run or if unreadable)."""
+        try:
+            cache = orjson.loads(self.CACHE_PATH.read_bytes())
+            return {"exists": cache.get("exists", {}), "latest": cache.get("latest", {})}
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning("[MavenCentralTool] Ignoring unreadable cache %s: %s", self.CACHE_PATH, e)
+        return {"exists": {}, "latest": {}}
+
+    def _save_cache(self):
+        """Flush the lookup cache to disk (registered with atexit)."""
+        if not self._cache_dirty:
+            return
+        try:
+            with self._cache_lock:
+                payload = orjson.dumps(self._cache)
+            self.CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.CACHE_PATH.with_suffix(".tmp")
+            tmp_path.write_bytes(payload)
+            tmp_path.replace(self.CACHE_PATH)
+            self._cache_dirty = False
+        except Exception as e:
+            logger.warning("[MavenCentralTool] Could not save cache to %s: %s", self.CACHE_PATH, e)
+
+    def _remember(self, section: str, key: str, value):
+        with self._cache_lock:
+            self._cache[section][key] = [value, time.time()]
+            self._cache_dirty = True
+
     def _check_version_exists(self, g: str, a: str, v: str) -> bool:
         """Query Maven Central to see if a specific GAV coordinate exists."""
+        key = f"{g}:{a}:{v}"
+        cached = self._cache["exists"].get(key)
+        if cached and (cached[0] or time.time() - cached[1] < self.NEGATIVE_TTL):
+            return cached[0]
+
+        # Fast path: HEAD the artifact's pom straight from the (CDN-cached) repository
+        found = self._repo_has_version(g, a, v)
+        if found is not None:
+            self._remember("exists", key, found)
+            logger.debug("[MavenCentralTool] Check %s:%s:%s -> %s", g, a, v, "exists" if found else "NOT found")
+            return found
+
         params = {
             "q": f'g:"{g}" AND a:"{a}" AND v:"{v}"',
             "rows": 1,
             "wt": "json",
         }
         try:
-            resp = requests.get(self.SEARCH_URL, params=params, timeout=self.REQUEST_TIMEOUT)
+            resp = self._session.get(self.SEARCH_URL, params=params, timeout=self.REQUEST_TIMEOUT)
             resp.raise_for_status()
-            data = resp.json()
+            data = orjson.loads(resp.content)
             found = data["response"]["numFound"] > 0
-            logger.debug(f"[MavenCentralTool] Check {g}:{a}:{v} -> {'exists' if found else 'NOT found'}")
+            self._remember("exists", key, found)
+            logger.debug("[MavenCentralTool] Check %s:%s:%s -> %s", g, a, v, "exists" if found else "NOT found")
             return found
         except Exception as e:
-            logger.error(f"[MavenCentralTool] Failed to query Maven Central for {g}:{a}:{v}: {e}")
+            logger.error("[MavenCentralTool] Failed to query Maven Central for %s:%s:%s: %s", g, a, v, e)
             return False  # Can't verify — caller decides fallback
 
     def _get_latest_version(self, g: str, a: str) -> str:
         """Fetch the latest version of an artifact from Maven Central."""
+        key = f"{g}:{a}"
+        cached = self._cache["latest"].get(key)
+        if cached and time.time() - cached[1] < self.LATEST_TTL:
+            return cached[0]
+
+        # Fast path: the artifact's maven-metadata.xml, a tiny CDN-cached file
+        latest = self._repo_latest_version(g, a)
+        if latest:
+            self._remember("latest", key, latest)
+            return latest
+
         params = {
             "q": f'g:"{g}" AND a:"{a}"',
             "core": "gav",
@@ -136,15 +241,53 @@ class MavenCentralTool:
             "wt": "json",
         }
         try:
-            resp = requests.get(self.SEARCH_URL, params=params, timeout=self.REQUEST_TIMEOUT)
+            resp = self._session.get(self.SEARCH_URL, params=params, timeout=self.REQUEST_TIMEOUT)
             resp.raise_for_status()
-            data = resp.json()
+            data = orjson.loads(resp.content)
             if data["response"]["numFound"] > 0:
-                return data["response"]["docs"][0]["v"]
+                latest = data["response"]["docs"][0]["v"]
+                self._remember("latest", key, latest)
+                return latest
         except Exception as e:
-            logger.error(f"[MavenCentralTool] Failed to fetch latest version for {g}:{a}: {e}")
+            logger.error("[MavenCentralTool] Failed to fetch latest version for %s:%s: %s", g, a, e)
         return "LATEST"
 
 
+    def _artifact_url(self, g: str, a: str) -> str:
+        return f"{self.REPO_URL}/{g.replace('.', '/')}/{a}"
+
+    def _repo_has_version(self, g: str, a: str, v: str) -> Optional[bool]:
+        """HEAD the version's pom on repo1; None if the repository couldn't answer."""
+        try:
+            resp = self._session.head(f"{self._artifact_url(g, a)}/{v}/{a}-{v}.pom", timeout=self.REQUEST_TIMEOUT)
+            if resp.status_code == 200:
+                return True
+            if resp.status_code == 404:
+                return False
+        except Exception as e:
+            logger.warning("[MavenCentralTool] Repository check failed for %s:%s:%s, using search: %s", g, a, v, e)
+        return None
+
+    def _repo_latest_version(self, g: str, a: str) -> Optional[str]:
+        """Latest release from maven-metadata.xml on repo1, or None to fall back to search."""
+        try:
+            resp = self._session.get(f"{self._artifact_url(g, a)}/maven-metadata.xml", timeout=self.REQUEST_TIMEOUT)
+            if resp.status_code != 200:
+                return None
+            versioning = ET.fromstring(resp.content).find("versioning")
+            if versioning is None:
+                return None
+            # <release> skips snapshots; older metadata may only carry <latest> / <versions>
+            for tag in ("release", "latest"):
+                value = versioning.findtext(tag)
+                if value:
+                    return value.strip()
+            versions = versioning.findall("versions/version")
+            return versions[-1].text.strip() if versions and versions[-1].text else None
+        except Exception as e:
+            logger.warning("[MavenCentralTool] maven-metadata.xml lookup failed for %s:%s, using search: %s", g, a, e)
+            return None
+
+
 # Singleton instance for shared use across agents
 maven_central_tool = MavenCentralTool()